@@ -1,16 +1,57 @@
+import atexit
 import os
-import json
 import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import msgpack
+import orjson
 import pandas as pd
 import numpy as np
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from elasticsearch import Elasticsearch
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.pipeline import Pipeline
 
 logger = logging.getLogger(__name__)
 
+# 공용 로그 텍스트 템플릿 (핫 루프에서 동일한 f-string을 반복 구성하지 않도록 모듈 수준에 유지)
+_NGINX_LOG_FMT = "{ts} {ip} {method} {path} {status} {rt}ms"
+_SYS_METRIC_FMT = "{ts} {host} CPU: {cpu}% Memory: {mem}% Disk: {disk}%"
+
+def _nginx_log_text(log: Dict[str, Any]) -> str:
+    """Nginx 액세스 로그 한 건의 공용 로그 텍스트를 만듭니다."""
+    return _NGINX_LOG_FMT.format(
+        ts=log.get('timestamp'), ip=log.get('client_ip'),
+        method=log.get('request_method'), path=log.get('request_path'),
+        status=log.get('status_code'), rt=log.get('response_time')
+    )
+
+
+# 프로세스 전역 Elasticsearch 클라이언트 캐시 (연결 설정별로 하나만 생성)
+_ES_CLIENTS: Dict[tuple, Elasticsearch] = {}
+
+
+def _get_es_client(host: str, port: int, user: str, password: str) -> Elasticsearch:
+    """연결 설정이 같은 Elasticsearch 클라이언트를 프로세스 내에서 재사용합니다."""
+    key = (host, port, user, password)
+    client = _ES_CLIENTS.get(key)
+    if client is None:
+        client = Elasticsearch(
+            [f"http://{host}:{port}"],
+            basic_auth=(user, password),
+            http_compress=True,
+            request_timeout=30,
+            connections_per_node=10,
+            retry_on_timeout=True,
+            max_retries=2
+        )
+        _ES_CLIENTS[key] = client
+    return client
+
+
 class DataProcessor:
     """
     로그 데이터 처리 클래스
@@ -32,19 +73,35 @@ class DataProcessor:
         # 마지막 처리 시간 저장 파일
         self.last_processed_file = os.path.join(self.data_dir, "last_processed.json")
         
-        # 처리된 데이터 저장 파일
-        self.processed_data_file = os.path.join(self.data_dir, "processed_data.json")
+        # 처리된 데이터 저장 파일 (레코드 단위 msgpack 스트림)
+        self.processed_data_file = os.path.join(self.data_dir, "processed_data.msgpack")
         
+        # 마지막 처리 시간 캐시 (mtime 기반 무효화, 변경 없는 재저장 방지)
+        self._last_processed_cache: Optional[Dict[str, datetime]] = None
+        self._last_processed_mtime: Optional[float] = None
+        self._last_saved_state: Optional[Dict[str, str]] = None
+
         # 마지막 처리 시간 초기화
         self.last_processed = self._load_last_processed()
+
+        # 처리 데이터 기록용 백그라운드 플러시 스레드 (단일 워커라 쓰기 순서 보장)
+        self._flush_exec = ThreadPoolExecutor(max_workers=1)
+        atexit.register(self._flush_exec.shutdown, wait=True)
+
+        # 로그 메시지 벡터화 파이프라인 (상태 없는 해싱 벡터라이저라 배치 간 재사용 가능)
+        self._vec_pipeline = Pipeline([
+            ("hash", HashingVectorizer(
+                n_features=2 ** 14, alternate_sign=False, dtype=np.float32
+            )),
+            ("tfidf", TfidfTransformer(sublinear_tf=True))
+        ])
         
         logger.info(f"데이터 프로세서 초기화: ES={self.es_host}:{self.es_port}, 데이터 디렉토리={self.data_dir}")
         
-        # Elasticsearch 클라이언트 초기화
+        # Elasticsearch 클라이언트 초기화 (프로세스 단위로 재사용)
         try:
-            self.es_client = Elasticsearch(
-                [f"http://{self.es_host}:{self.es_port}"],
-                basic_auth=(self.es_user, self.es_password)
+            self.es_client = _get_es_client(
+                self.es_host, self.es_port, self.es_user, self.es_password
             )
             logger.info("Elasticsearch 연결 성공")
         except Exception as e:
@@ -55,12 +112,20 @@ class DataProcessor:
         """마지막 처리 시간을 로드합니다."""
         if os.path.exists(self.last_processed_file):
             try:
-                with open(self.last_processed_file, 'r') as f:
-                    data = json.load(f)
-                    return {
-                        k: datetime.fromisoformat(v) 
+                # mtime이 그대로면 파일 파싱을 건너뛰고 캐시를 반환
+                mtime = os.stat(self.last_processed_file).st_mtime
+                if self._last_processed_cache is not None and mtime == self._last_processed_mtime:
+                    return self._last_processed_cache
+
+                with open(self.last_processed_file, 'rb') as f:
+                    data = orjson.loads(f.read())
+                    parsed = {
+                        k: datetime.fromisoformat(v)
                         for k, v in data.items()
                     }
+                    self._last_processed_cache = parsed
+                    self._last_processed_mtime = mtime
+                    return parsed
             except Exception as e:
                 logger.error(f"마지막 처리 시간 로드 실패: {str(e)}")
         
@@ -74,34 +139,50 @@ class DataProcessor:
     
     def _save_last_processed(self):
         """마지막 처리 시간을 저장합니다."""
+        snapshot = {k: v.isoformat() for k, v in self.last_processed.items()}
+
+        # 값이 바뀌지 않았으면 디스크 쓰기를 건너뜁니다
+        if snapshot == self._last_saved_state:
+            return
+
         try:
-            with open(self.last_processed_file, 'w') as f:
-                json.dump({
-                    k: v.isoformat() 
-                    for k, v in self.last_processed.items()
-                }, f)
+            # 임시 파일에 쓴 뒤 원자적으로 교체 (부분 쓰기로 인한 손상 방지)
+            tmp_path = self.last_processed_file + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(snapshot))
+            os.replace(tmp_path, self.last_processed_file)
+
+            self._last_saved_state = snapshot
+            self._last_processed_cache = dict(self.last_processed)
+            self._last_processed_mtime = os.stat(self.last_processed_file).st_mtime
             logger.info("마지막 처리 시간 저장 완료")
         except Exception as e:
             logger.error(f"마지막 처리 시간 저장 실패: {str(e)}")
     
     def _save_processed_data(self, data: List[Dict[str, Any]]):
-        """처리된 데이터를 저장합니다."""
+        """처리된 데이터 기록을 백그라운드 스레드에 위임합니다 (호출자는 디스크 I/O를 기다리지 않음)."""
+        self._flush_exec.submit(self._write_processed_data, data)
+
+    def _write_processed_data(self, data: List[Dict[str, Any]]):
+        """처리된 데이터를 msgpack 레코드 스트림으로 저장합니다 (전체 리스트를 한 번에 직렬화하지 않음)."""
         try:
-            with open(self.processed_data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            packer = msgpack.Packer(use_bin_type=True)
+            with open(self.processed_data_file, 'wb') as f:
+                for item in data:
+                    f.write(packer.pack(item))
             logger.info(f"처리된 데이터 저장 완료: {len(data)}개 항목")
         except Exception as e:
             logger.error(f"처리된 데이터 저장 실패: {str(e)}")
-    
+
     def get_latest_processed_data(self) -> List[Dict[str, Any]]:
         """가장 최근에 처리된 데이터를 반환합니다."""
         if os.path.exists(self.processed_data_file):
             try:
-                with open(self.processed_data_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(self.processed_data_file, 'rb') as f:
+                    return list(msgpack.Unpacker(f, raw=False))
             except Exception as e:
                 logger.error(f"처리된 데이터 로드 실패: {str(e)}")
-        
+
         return []
     
     def process_new_logs(self) -> List[Dict[str, Any]]:
@@ -117,16 +198,14 @@ class DataProcessor:
         
         # 현재 시간
         now = datetime.now()
-        
-        # 애플리케이션 로그 처리
-        app_logs = self._fetch_application_logs(self.last_processed["application_logs"], now)
-        
-        # Nginx 액세스 로그 처리
-        nginx_logs = self._fetch_nginx_logs(self.last_processed["nginx_access"], now)
-        
-        # 시스템 메트릭 처리
-        system_metrics = self._fetch_system_metrics(self.last_processed["system_metrics"], now)
-        
+
+        # 세 소스를 스레드로 동시에 가져옵니다 (처리 시간은 항상 함께 갱신되므로 구간이 동일)
+        start_time = min(self.last_processed.values())
+        fetched = self._fetch_all_sources(start_time, now)
+        app_logs = fetched["application_logs"]
+        nginx_logs = fetched["nginx_access"]
+        system_metrics = fetched["system_metrics"]
+
         # 마지막 처리 시간 업데이트
         self.last_processed["application_logs"] = now
         self.last_processed["nginx_access"] = now
@@ -145,40 +224,111 @@ class DataProcessor:
         
         return all_data
     
+    def _fetch_all_sources(self, start_time: datetime, end_time: datetime) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        세 로그 소스를 동시에 조회하여 소스별로 분류합니다.
+
+        독립적인 I/O이므로 스레드 풀로 병렬 실행하면 전체 소요 시간이
+        가장 느린 단일 조회 수준으로 줄어듭니다.
+
+        Args:
+            start_time (datetime): 시작 시간
+            end_time (datetime): 종료 시간
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: 소스 키별 로그 목록
+        """
+        fetchers = {
+            "application_logs": self._fetch_application_logs,
+            "nginx_access": self._fetch_nginx_logs,
+            "system_metrics": self._fetch_system_metrics,
+        }
+
+        with ThreadPoolExecutor(max_workers=len(fetchers)) as executor:
+            futures = {
+                key: executor.submit(fetch, start_time, end_time)
+                for key, fetch in fetchers.items()
+            }
+            buckets = {key: future.result() for key, future in futures.items()}
+
+        logger.info(
+            f"로그 가져오기 완료: 애플리케이션 {len(buckets['application_logs'])}개, "
+            f"Nginx {len(buckets['nginx_access'])}개, "
+            f"시스템 메트릭 {len(buckets['system_metrics'])}개"
+        )
+        return buckets
+
+    def _scan_source(self, index: str, query: Dict[str, Any],
+                     source_fields: List[str], page_size: int = 2000) -> List[Dict[str, Any]]:
+        """
+        search_after 페이지네이션으로 인덱스의 전체 구간을 가져옵니다.
+
+        스크롤 컨텍스트를 서버에 유지하지 않아 페이지 간 부하가 없고,
+        timestamp + _doc 정렬 키로 페이지 경계가 안정적으로 이어집니다.
+
+        Args:
+            index (str): 조회할 인덱스 패턴
+            query (Dict[str, Any]): range 쿼리 본문
+            source_fields (List[str]): 가져올 _source 필드 목록
+            page_size (int): 페이지당 문서 수
+
+        Returns:
+            List[Dict[str, Any]]: 문서 _source 목록
+        """
+        results: List[Dict[str, Any]] = []
+        search_after = None
+
+        while True:
+            kwargs: Dict[str, Any] = {
+                "index": index,
+                "query": query,
+                "_source": source_fields,
+                "sort": [{"timestamp": "asc"}, {"_doc": "asc"}],
+                "size": page_size
+            }
+            if search_after is not None:
+                kwargs["search_after"] = search_after
+
+            response = self.es_client.search(**kwargs)
+            hits = response["hits"]["hits"]
+            results.extend(hit["_source"] for hit in hits)
+
+            if len(hits) < page_size:
+                break
+            search_after = hits[-1].get("sort")
+            if search_after is None:
+                break
+
+        return results
+
     def _fetch_application_logs(self, start_time: datetime, end_time: datetime) -> List[Dict[str, Any]]:
         """
         Elasticsearch에서 애플리케이션 로그를 가져옵니다.
-        
+
         Args:
             start_time (datetime): 시작 시간
             end_time (datetime): 종료 시간
-            
+
         Returns:
             List[Dict[str, Any]]: 애플리케이션 로그 목록
         """
         try:
             query = {
-                "query": {
-                    "range": {
-                        "timestamp": {
-                            "gte": start_time.isoformat(),
-                            "lt": end_time.isoformat()
-                        }
+                "range": {
+                    "timestamp": {
+                        "gte": start_time.isoformat(),
+                        "lt": end_time.isoformat()
                     }
-                },
-                "sort": [{"timestamp": {"order": "asc"}}],
-                "size": 1000
+                }
             }
-            
-            response = self.es_client.search(
-                index="application-logs-*",
-                body=query
+
+            logs = self._scan_source(
+                "application-logs-*", query,
+                ["timestamp", "service", "log_level", "message", "stack_trace"]
             )
-            
-            logs = [hit["_source"] for hit in response["hits"]["hits"]]
             logger.info(f"애플리케이션 로그 {len(logs)}개 가져옴")
             return logs
-            
+
         except Exception as e:
             logger.error(f"애플리케이션 로그 가져오기 실패: {str(e)}")
             return []
@@ -196,24 +346,21 @@ class DataProcessor:
         """
         try:
             query = {
-                "query": {
-                    "range": {
-                        "timestamp": {
-                            "gte": start_time.isoformat(),
-                            "lt": end_time.isoformat()
-                        }
+                "range": {
+                    "timestamp": {
+                        "gte": start_time.isoformat(),
+                        "lt": end_time.isoformat()
                     }
-                },
-                "sort": [{"timestamp": {"order": "asc"}}],
-                "size": 1000
+                }
             }
-            
-            response = self.es_client.search(
-                index="nginx-access-*",
-                body=query
+
+            logs = self._scan_source(
+                "nginx-access-*", query,
+                [
+                    "timestamp", "client_ip", "request_method",
+                    "request_path", "status_code", "response_time"
+                ]
             )
-            
-            logs = [hit["_source"] for hit in response["hits"]["hits"]]
             logger.info(f"Nginx 액세스 로그 {len(logs)}개 가져옴")
             return logs
             
@@ -234,24 +381,18 @@ class DataProcessor:
         """
         try:
             query = {
-                "query": {
-                    "range": {
-                        "timestamp": {
-                            "gte": start_time.isoformat(),
-                            "lt": end_time.isoformat()
-                        }
+                "range": {
+                    "timestamp": {
+                        "gte": start_time.isoformat(),
+                        "lt": end_time.isoformat()
                     }
-                },
-                "sort": [{"timestamp": {"order": "asc"}}],
-                "size": 1000
+                }
             }
-            
-            response = self.es_client.search(
-                index="system-metrics-*",
-                body=query
+
+            metrics = self._scan_source(
+                "system-metrics-*", query,
+                ["timestamp", "host", "cpu_usage", "memory_usage", "disk_usage"]
             )
-            
-            metrics = [hit["_source"] for hit in response["hits"]["hits"]]
             logger.info(f"시스템 메트릭 {len(metrics)}개 가져옴")
             return metrics
             
@@ -271,56 +412,89 @@ class DataProcessor:
         """
         if not logs:
             return []
-        
-        # 로그 레벨별 분류
-        error_logs = [log for log in logs if log.get("log_level") == "ERROR"]
-        warning_logs = [log for log in logs if log.get("log_level") == "WARNING"]
-        info_logs = [log for log in logs if log.get("log_level") == "INFO"]
-        
+
+        # DataFrame으로 한 번만 변환하여 레벨별 분류와 문자열 결합을 벡터화 처리
+        df = pd.DataFrame(logs)
+        for col in ("timestamp", "service", "log_level", "message"):
+            if col not in df.columns:
+                df[col] = None
+
+        # 공통 로그 텍스트를 C 레벨 문자열 연산으로 일괄 생성
+        base_text = (
+            df["timestamp"].astype(str) + " " + df["service"].astype(str) + " "
+            + df["log_level"].astype(str) + " " + df["message"].astype(str)
+        )
+
+        # 로그 레벨별 분류 (불리언 마스크)
+        error_mask = df["log_level"].eq("ERROR")
+        warning_mask = df["log_level"].eq("WARNING")
+        info_logs = df[df["log_level"].eq("INFO")].to_dict("records")
+
         # 결과 데이터
         result = []
-        
+
         # 오류 로그 처리 (이상 탐지 학습 데이터)
-        if error_logs:
-            for log in error_logs:
-                log_text = f"{log.get('timestamp')} {log.get('service')} {log.get('log_level')} {log.get('message')}"
-                if log.get('stack_trace'):
-                    log_text += f"\n{log.get('stack_trace')}"
-                
-                result.append({
+        if error_mask.any():
+            error_df = df[error_mask]
+            log_text = base_text[error_mask]
+            if "stack_trace" in error_df.columns:
+                stack = error_df["stack_trace"]
+                log_text = log_text + np.where(
+                    stack.notna() & stack.astype(bool), "\n" + stack.astype(str), ""
+                )
+            result.extend(
+                pd.DataFrame({
                     "task_type": "anomaly",
                     "log_text": log_text,
                     "anomaly_status": "critical",
-                    "detected_issues": ["오류 발생"],
-                    "explanation": f"서비스 '{log.get('service')}'에서 오류가 발생했습니다: {log.get('message')}"
-                })
-        
+                    "detected_issues": [["오류 발생"] for _ in range(len(error_df))],
+                    "explanation": (
+                        "서비스 '" + error_df["service"].astype(str)
+                        + "'에서 오류가 발생했습니다: " + error_df["message"].astype(str)
+                    )
+                }).to_dict("records")
+            )
+
         # 경고 로그 처리 (이상 탐지 학습 데이터)
-        if warning_logs:
-            for log in warning_logs:
-                log_text = f"{log.get('timestamp')} {log.get('service')} {log.get('log_level')} {log.get('message')}"
-                
-                result.append({
+        if warning_mask.any():
+            warning_df = df[warning_mask]
+            result.extend(
+                pd.DataFrame({
                     "task_type": "anomaly",
-                    "log_text": log_text,
+                    "log_text": base_text[warning_mask],
                     "anomaly_status": "warning",
-                    "detected_issues": ["경고 발생"],
-                    "explanation": f"서비스 '{log.get('service')}'에서 경고가 발생했습니다: {log.get('message')}"
-                })
-        
+                    "detected_issues": [["경고 발생"] for _ in range(len(warning_df))],
+                    "explanation": (
+                        "서비스 '" + warning_df["service"].astype(str)
+                        + "'에서 경고가 발생했습니다: " + warning_df["message"].astype(str)
+                    )
+                }).to_dict("records")
+            )
+
         # 정보 로그 처리 (요약 학습 데이터)
         if len(info_logs) >= 10:
             # 로그 메시지 클러스터링
             try:
-                messages = [log.get('message', '') for log in info_logs if log.get('message')]
+                # DataFrame 왕복으로 누락된 message가 NaN이 될 수 있으므로 문자열만 통과
+                messages = [
+                    log['message'] for log in info_logs
+                    if isinstance(log.get('message'), str) and log['message']
+                ]
                 if len(messages) >= 10:
-                    # TF-IDF 벡터화
-                    vectorizer = TfidfVectorizer(max_features=100)
-                    X = vectorizer.fit_transform(messages)
-                    
-                    # K-means 클러스터링
+                    # 해싱 기반 TF-IDF 벡터화 (단일 패스, 어휘 사전 구축 없음)
+                    X = self._vec_pipeline.fit_transform(messages)
+
+                    # 미니배치 K-means 클러스터링
                     n_clusters = min(5, len(messages) // 2)
-                    kmeans = KMeans(n_clusters=n_clusters, random_state=42)
+                    # k-means++ 초기화로 시드 품질을 확보하고 재시작 횟수는 1회로 제한
+                    kmeans = MiniBatchKMeans(
+                        n_clusters=n_clusters,
+                        batch_size=min(256, len(messages)),
+                        random_state=42,
+                        init='k-means++',
+                        n_init=1,
+                        max_no_improvement=5
+                    )
                     clusters = kmeans.fit_predict(X)
                     
                     # 클러스터별 대표 로그 선택
@@ -360,85 +534,87 @@ class DataProcessor:
         """
         if not logs:
             return []
-        
-        # 상태 코드별 분류
-        error_logs = [log for log in logs if log.get("status_code", 0) >= 500]
-        warning_logs = [log for log in logs if 400 <= log.get("status_code", 0) < 500]
-        success_logs = [log for log in logs if 200 <= log.get("status_code", 0) < 400]
-        
-        # 결과 데이터
+
+        # 상태 코드/응답 시간을 한 번에 배열로 추출한 뒤 C 레벨 마스크로 분류
+        status = np.fromiter(
+            (log.get("status_code", 0) for log in logs), dtype=np.int32, count=len(logs)
+        )
+        response_time = np.fromiter(
+            (log.get("response_time", 0) for log in logs), dtype=np.float64, count=len(logs)
+        )
+
+        error_idx = np.nonzero(status >= 500)[0]
+        warning_idx = np.nonzero((status >= 400) & (status < 500))[0]
+        success_idx = np.nonzero((status >= 200) & (status < 400))[0]
+        slow_idx = success_idx[response_time[success_idx] > 1000]  # 1초 이상
+
+        error_logs = [logs[i] for i in error_idx]
+        warning_logs = [logs[i] for i in warning_idx]
+        success_logs = [logs[i] for i in success_idx]
+
+        # 결과 데이터 (핫 루프에서 속성 조회를 피하도록 메서드를 지역 변수에 바인딩)
         result = []
-        
+        append = result.append
+
         # 오류 로그 처리 (이상 탐지 학습 데이터)
         if error_logs:
             for log in error_logs:
-                log_text = (
-                    f"{log.get('timestamp')} {log.get('client_ip')} {log.get('request_method')} "
-                    f"{log.get('request_path')} {log.get('status_code')} {log.get('response_time')}ms"
-                )
-                
-                result.append({
+                g = log.get
+                append({
                     "task_type": "anomaly",
-                    "log_text": log_text,
+                    "log_text": _nginx_log_text(log),
                     "anomaly_status": "critical",
-                    "detected_issues": [f"서버 오류 {log.get('status_code')}"],
-                    "explanation": f"서버 오류 {log.get('status_code')}가 발생했습니다. 요청 경로: {log.get('request_path')}"
+                    "detected_issues": [f"서버 오류 {g('status_code')}"],
+                    "explanation": f"서버 오류 {g('status_code')}가 발생했습니다. 요청 경로: {g('request_path')}"
                 })
-        
+
         # 경고 로그 처리 (이상 탐지 학습 데이터)
         if warning_logs:
             for log in warning_logs:
-                log_text = (
-                    f"{log.get('timestamp')} {log.get('client_ip')} {log.get('request_method')} "
-                    f"{log.get('request_path')} {log.get('status_code')} {log.get('response_time')}ms"
-                )
-                
-                result.append({
+                g = log.get
+                append({
                     "task_type": "anomaly",
-                    "log_text": log_text,
+                    "log_text": _nginx_log_text(log),
                     "anomaly_status": "warning",
-                    "detected_issues": [f"클라이언트 오류 {log.get('status_code')}"],
-                    "explanation": f"클라이언트 오류 {log.get('status_code')}가 발생했습니다. 요청 경로: {log.get('request_path')}"
+                    "detected_issues": [f"클라이언트 오류 {g('status_code')}"],
+                    "explanation": f"클라이언트 오류 {g('status_code')}가 발생했습니다. 요청 경로: {g('request_path')}"
                 })
-        
+
         # 응답 시간이 느린 로그 처리 (이상 탐지 학습 데이터)
-        slow_logs = [log for log in success_logs if log.get("response_time", 0) > 1000]  # 1초 이상
+        slow_logs = [logs[i] for i in slow_idx]
         if slow_logs:
             for log in slow_logs:
-                log_text = (
-                    f"{log.get('timestamp')} {log.get('client_ip')} {log.get('request_method')} "
-                    f"{log.get('request_path')} {log.get('status_code')} {log.get('response_time')}ms"
-                )
-                
-                result.append({
+                g = log.get
+                append({
                     "task_type": "anomaly",
-                    "log_text": log_text,
+                    "log_text": _nginx_log_text(log),
                     "anomaly_status": "warning",
                     "detected_issues": ["응답 시간 지연"],
-                    "explanation": f"응답 시간이 {log.get('response_time')}ms로 지연되었습니다. 요청 경로: {log.get('request_path')}"
+                    "explanation": f"응답 시간이 {g('response_time')}ms로 지연되었습니다. 요청 경로: {g('request_path')}"
                 })
         
         # 트래픽 요약 (요약 학습 데이터)
         if success_logs:
             try:
-                # 경로별 요청 수 계산
-                path_counts = {}
-                for log in success_logs:
-                    path = log.get('request_path', '')
-                    if path:
-                        path_counts[path] = path_counts.get(path, 0) + 1
-                
-                # 상위 경로 추출
-                top_paths = sorted(path_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+                # 경로별 요청 수 계산 후 상위 경로 추출 (np.unique + argpartition 부분 정렬)
+                paths = np.array([
+                    log.get('request_path', '')
+                    for log in success_logs
+                    if log.get('request_path')
+                ])
+                top_paths = []
+                if paths.size:
+                    uniq, counts = np.unique(paths, return_counts=True)
+                    k = min(5, uniq.size)
+                    top_idx = np.argpartition(counts, -k)[-k:]
+                    top_idx = top_idx[np.argsort(counts[top_idx])[::-1]]
+                    top_paths = [(uniq[i], int(counts[i])) for i in top_idx]
                 
                 if top_paths:
                     # 원본 텍스트 생성
-                    original_text = "웹 트래픽 로그:\n"
-                    for i, log in enumerate(success_logs[:20]):
-                        original_text += (
-                            f"{log.get('timestamp')} {log.get('client_ip')} {log.get('request_method')} "
-                            f"{log.get('request_path')} {log.get('status_code')} {log.get('response_time')}ms\n"
-                        )
+                    original_text = "웹 트래픽 로그:\n" + "".join(
+                        _nginx_log_text(log) + "\n" for log in success_logs[:20]
+                    )
                     
                     # 요약 생성
                     summary = f"웹 트래픽 요약: 총 {len(success_logs)}개의 성공적인 요청이 있었습니다. "
@@ -447,7 +623,7 @@ class DataProcessor:
                         summary += f"{path} ({count}회), "
                     summary = summary.rstrip(", ")
                     
-                    result.append({
+                    append({
                         "task_type": "summary",
                         "original_text": original_text,
                         "summary": summary
@@ -471,107 +647,105 @@ class DataProcessor:
         if not metrics:
             return []
         
-        # 결과 데이터
+        # 결과 데이터 (핫 루프에서 속성 조회를 피하도록 메서드를 지역 변수에 바인딩)
         result = []
-        
+        append = result.append
+
         # 호스트별 메트릭 그룹화
-        host_metrics = {}
+        host_metrics = defaultdict(list)
         for metric in metrics:
-            host = metric.get('host', 'unknown')
-            if host not in host_metrics:
-                host_metrics[host] = []
-            host_metrics[host].append(metric)
-        
+            host_metrics[metric.get('host', 'unknown')].append(metric)
+
         # 호스트별 처리
         for host, host_data in host_metrics.items():
-            # CPU 사용량 높은 경우 (이상 탐지 학습 데이터)
-            high_cpu_metrics = [m for m in host_data if m.get('cpu_usage', 0) > 80]
-            if high_cpu_metrics:
-                for metric in high_cpu_metrics:
-                    log_text = (
-                        f"{metric.get('timestamp')} {host} CPU: {metric.get('cpu_usage')}% "
-                        f"Memory: {metric.get('memory_usage')}% Disk: {metric.get('disk_usage')}%"
-                    )
-                    
-                    result.append({
+            # 임계치 검사 (CPU/메모리/디스크를 단일 순회로 함께 분류, 이상 탐지 학습 데이터)
+            for metric in host_data:
+                g = metric.get
+                cpu = g('cpu_usage', 0)
+                mem = g('memory_usage', 0)
+                disk = g('disk_usage', 0)
+
+                if cpu <= 80 and mem <= 90 and disk <= 85:
+                    continue
+
+                log_text = _SYS_METRIC_FMT.format(
+                    ts=g('timestamp'), host=host, cpu=cpu, mem=mem, disk=disk
+                )
+
+                if cpu > 80:
+                    append({
                         "task_type": "anomaly",
                         "log_text": log_text,
                         "anomaly_status": "warning",
                         "detected_issues": ["CPU 사용량 높음"],
-                        "explanation": f"호스트 '{host}'의 CPU 사용량이 {metric.get('cpu_usage')}%로 높습니다."
+                        "explanation": f"호스트 '{host}'의 CPU 사용량이 {cpu}%로 높습니다."
                     })
-            
-            # 메모리 사용량 높은 경우 (이상 탐지 학습 데이터)
-            high_mem_metrics = [m for m in host_data if m.get('memory_usage', 0) > 90]
-            if high_mem_metrics:
-                for metric in high_mem_metrics:
-                    log_text = (
-                        f"{metric.get('timestamp')} {host} CPU: {metric.get('cpu_usage')}% "
-                        f"Memory: {metric.get('memory_usage')}% Disk: {metric.get('disk_usage')}%"
-                    )
-                    
-                    result.append({
+
+                if mem > 90:
+                    append({
                         "task_type": "anomaly",
                         "log_text": log_text,
                         "anomaly_status": "critical",
                         "detected_issues": ["메모리 사용량 높음"],
-                        "explanation": f"호스트 '{host}'의 메모리 사용량이 {metric.get('memory_usage')}%로 매우 높습니다."
+                        "explanation": f"호스트 '{host}'의 메모리 사용량이 {mem}%로 매우 높습니다."
                     })
-            
-            # 디스크 사용량 높은 경우 (이상 탐지 학습 데이터)
-            high_disk_metrics = [m for m in host_data if m.get('disk_usage', 0) > 85]
-            if high_disk_metrics:
-                for metric in high_disk_metrics:
-                    log_text = (
-                        f"{metric.get('timestamp')} {host} CPU: {metric.get('cpu_usage')}% "
-                        f"Memory: {metric.get('memory_usage')}% Disk: {metric.get('disk_usage')}%"
-                    )
-                    
-                    result.append({
+
+                if disk > 85:
+                    append({
                         "task_type": "anomaly",
                         "log_text": log_text,
                         "anomaly_status": "warning",
                         "detected_issues": ["디스크 사용량 높음"],
-                        "explanation": f"호스트 '{host}'의 디스크 사용량이 {metric.get('disk_usage')}%로 높습니다."
+                        "explanation": f"호스트 '{host}'의 디스크 사용량이 {disk}%로 높습니다."
                     })
-            
+
             # 시스템 성능 요약 (요약 학습 데이터)
             if len(host_data) >= 10:
                 try:
-                    # 시간별 평균 계산
-                    df = pd.DataFrame(host_data)
-                    if 'timestamp' in df.columns:
-                        df['timestamp'] = pd.to_datetime(df['timestamp'])
-                        df.set_index('timestamp', inplace=True)
-                        hourly_avg = df.resample('H').mean()
-                        
-                        if not hourly_avg.empty:
-                            # 원본 텍스트 생성
-                            original_text = f"호스트 '{host}' 시스템 메트릭:\n"
-                            for i, metric in enumerate(host_data[:20]):
-                                original_text += (
-                                    f"{metric.get('timestamp')} CPU: {metric.get('cpu_usage')}% "
-                                    f"Memory: {metric.get('memory_usage')}% Disk: {metric.get('disk_usage')}%\n"
-                                )
-                            
-                            # 요약 생성
-                            avg_cpu = hourly_avg['cpu_usage'].mean() if 'cpu_usage' in hourly_avg else 0
-                            avg_mem = hourly_avg['memory_usage'].mean() if 'memory_usage' in hourly_avg else 0
-                            avg_disk = hourly_avg['disk_usage'].mean() if 'disk_usage' in hourly_avg else 0
-                            
-                            summary = (
-                                f"호스트 '{host}' 시스템 성능 요약: "
-                                f"평균 CPU 사용량 {avg_cpu:.1f}%, "
-                                f"평균 메모리 사용량 {avg_mem:.1f}%, "
-                                f"평균 디스크 사용량 {avg_disk:.1f}%. "
-                                f"총 {len(host_data)}개의 메트릭이 수집되었습니다."
+                    # 시간별 평균 계산 (DataFrame 구성 없이 bincount로 집계)
+                    stamped = [m for m in host_data if m.get('timestamp')]
+                    if stamped:
+                        ts = np.array(
+                            [m['timestamp'] for m in stamped], dtype='datetime64[s]'
+                        )
+                        hour = ((ts - ts.min()) / np.timedelta64(1, 'h')).astype(np.int64)
+                        counts = np.bincount(hour)
+                        # 메트릭이 없는 시간대는 평균에서 제외 (0으로 집계하면 평균이 희석됨)
+                        occupied = counts > 0
+
+                        def hourly_mean(field: str) -> float:
+                            vals = np.fromiter(
+                                (m.get(field, 0) or 0 for m in stamped),
+                                dtype=np.float64, count=len(stamped)
                             )
-                            
-                            result.append({
-                                "task_type": "summary",
-                                "original_text": original_text,
-                                "summary": summary
-                            })
+                            sums = np.bincount(hour, weights=vals)
+                            return float((sums[occupied] / counts[occupied]).mean())
+
+                        # 원본 텍스트 생성
+                        original_text = f"호스트 '{host}' 시스템 메트릭:\n" + "".join(
+                            f"{m.get('timestamp')} CPU: {m.get('cpu_usage')}% "
+                            f"Memory: {m.get('memory_usage')}% Disk: {m.get('disk_usage')}%\n"
+                            for m in host_data[:20]
+                        )
+
+                        # 요약 생성
+                        avg_cpu = hourly_mean('cpu_usage')
+                        avg_mem = hourly_mean('memory_usage')
+                        avg_disk = hourly_mean('disk_usage')
+
+                        summary = (
+                            f"호스트 '{host}' 시스템 성능 요약: "
+                            f"평균 CPU 사용량 {avg_cpu:.1f}%, "
+                            f"평균 메모리 사용량 {avg_mem:.1f}%, "
+                            f"평균 디스크 사용량 {avg_disk:.1f}%. "
+                            f"총 {len(host_data)}개의 메트릭이 수집되었습니다."
+                        )
+
+                        append({
+                            "task_type": "summary",
+                            "original_text": original_text,
+                            "summary": summary
+                        })
                 except Exception as e:
                     logger.error(f"시스템 성능 요약 생성 실패: {str(e)}")
         
@@ -1,12 +1,18 @@
+import hashlib
 import os
-import json
 import logging
 import time
+
+import orjson
+from collections import defaultdict
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# 프롬프트에 포함할 최대 예제 수 (프롬프트 기반 학습은 이 이상에서 효과가 줄어듦)
+MAX_PROMPT_EXAMPLES = 200
+
 class FineTuner:
     """
     Ollama 모델 파인튜닝 클래스
@@ -25,11 +31,16 @@ class FineTuner:
         
         # 파인튜닝 설정
         self.data_dir = os.getenv("DATA_DIR", "data")
-        self.fine_tuning_history_file = os.path.join(self.data_dir, "fine_tuning_history.json")
+        self.fine_tuning_history_file = os.path.join(self.data_dir, "fine_tuning_history.jsonl")
         
         # 파인튜닝 히스토리 로드
         self.fine_tuning_history = self._load_fine_tuning_history()
-        
+
+        # 히스토리 버전 해시 (레코드 추가 시 증분 갱신, HTTP ETag로 노출)
+        self._history_hash = hashlib.md5()
+        for entry in self.fine_tuning_history:
+            self._history_hash.update(str(entry.get("timestamp", "")).encode())
+
         logger.info("파인튜닝 클래스 초기화 완료")
     
     def _load_fine_tuning_history(self) -> List[Dict[str, Any]]:
@@ -41,23 +52,28 @@ class FineTuner:
         """
         if os.path.exists(self.fine_tuning_history_file):
             try:
-                with open(self.fine_tuning_history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(self.fine_tuning_history_file, 'rb') as f:
+                    return [orjson.loads(line) for line in f if line.strip()]
             except Exception as e:
-                logger.error(f"파인튜닝 히스토리 로드 실패: {str(e)}")
-        
+                logger.error("파인튜닝 히스토리 로드 실패: %s", e)
+
         return []
-    
-    def _save_fine_tuning_history(self):
+
+    def _save_fine_tuning_history(self, new_records: List[Dict[str, Any]]):
         """
-        파인튜닝 히스토리를 저장합니다.
+        새로 추가된 히스토리 레코드만 파일에 이어 씁니다.
+
+        Args:
+            new_records (List[Dict[str, Any]]): 이번 파인튜닝에서 생성된 레코드
         """
         try:
-            with open(self.fine_tuning_history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.fine_tuning_history, f, ensure_ascii=False, indent=2)
+            with open(self.fine_tuning_history_file, 'ab') as f:
+                for record in new_records:
+                    f.write(orjson.dumps(record))
+                    f.write(b'\n')
             logger.info("파인튜닝 히스토리 저장 완료")
         except Exception as e:
-            logger.error(f"파인튜닝 히스토리 저장 실패: {str(e)}")
+            logger.error("파인튜닝 히스토리 저장 실패: %s", e)
     
     def fine_tune(self, training_data: List[Dict[str, Any]]) -> bool:
         """
@@ -73,147 +89,89 @@ class FineTuner:
             logger.warning("파인튜닝할 데이터가 없습니다")
             return False
         
-        logger.info(f"파인튜닝 시작: {len(training_data)}개 데이터")
-        
-        # 작업 유형별 데이터 분류
-        sentiment_data = [data for data in training_data if data.get("task_type") == "sentiment"]
-        anomaly_data = [data for data in training_data if data.get("task_type") == "anomaly"]
-        summary_data = [data for data in training_data if data.get("task_type") == "summary"]
-        
-        # 파인튜닝 결과
-        results = []
-        
-        # 감정 분석 파인튜닝
-        if sentiment_data:
-            result = self._fine_tune_sentiment(sentiment_data)
-            if result:
-                results.append(result)
-        
-        # 이상 탐지 파인튜닝
-        if anomaly_data:
-            result = self._fine_tune_anomaly(anomaly_data)
-            if result:
-                results.append(result)
-        
-        # 요약 파인튜닝
-        if summary_data:
-            result = self._fine_tune_summary(summary_data)
-            if result:
-                results.append(result)
+        logger.info("파인튜닝 시작: %d개 데이터", len(training_data))
         
+        # 작업 유형별 데이터 분류 (단일 순회)
+        buckets = defaultdict(list)
+        for data in training_data:
+            buckets[data.get("task_type")].append(data)
+
+        # 작업 유형별 파인튜닝과 히스토리 레코드 생성을 한 루프에서 수행
+        # (배치 단위로 동일한 타임스탬프 공유)
+        now_iso = datetime.now().isoformat()
+        new_records = []
+
+        for task_type in ("sentiment", "anomaly", "summary"):
+            data = buckets.get(task_type)
+            if data:
+                result = self._fine_tune(data, task_type)
+                if result:
+                    new_records.append({
+                        "timestamp": now_iso,
+                        "task_type": result.get("task_type"),
+                        "data_count": result.get("data_count"),
+                        "success": result.get("success"),
+                        "details": result.get("details")
+                    })
+
         # 파인튜닝 히스토리 업데이트
-        if results:
-            for result in results:
-                self.fine_tuning_history.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "task_type": result.get("task_type"),
-                    "data_count": result.get("data_count"),
-                    "success": result.get("success"),
-                    "details": result.get("details")
-                })
-            
-            # 히스토리 저장
-            self._save_fine_tuning_history()
-            
-            logger.info(f"파인튜닝 완료: {len(results)}개 작업 성공")
+        if new_records:
+            self.fine_tuning_history.extend(new_records)
+            for record in new_records:
+                self._history_hash.update(record["timestamp"].encode())
+
+            # 새 레코드만 파일에 이어 쓰기
+            self._save_fine_tuning_history(new_records)
+
+            logger.info("파인튜닝 완료: %d개 작업 성공", len(new_records))
             return True
         else:
             logger.warning("파인튜닝 실패: 모든 작업이 실패했습니다")
             return False
     
-    def _fine_tune_sentiment(self, data: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    # 작업 유형별 로그 라벨
+    _TASK_LABELS = {
+        "sentiment": "감정 분석",
+        "anomaly": "이상 탐지",
+        "summary": "요약"
+    }
+
+    def _fine_tune(self, data: List[Dict[str, Any]], task_type: str) -> Optional[Dict[str, Any]]:
         """
-        감정 분석 모델을 파인튜닝합니다.
-        
+        지정한 작업 유형의 모델을 파인튜닝합니다.
+
         Args:
-            data (List[Dict[str, Any]]): 감정 분석 학습 데이터
-            
+            data (List[Dict[str, Any]]): 해당 작업 유형의 학습 데이터
+            task_type (str): 작업 유형 (sentiment/anomaly/summary)
+
         Returns:
             Optional[Dict[str, Any]]: 파인튜닝 결과
         """
+        label = self._TASK_LABELS.get(task_type, task_type)
         try:
-            logger.info(f"감정 분석 파인튜닝 시작: {len(data)}개 데이터")
-            
-            # 파인튜닝 프롬프트 생성
-            prompt = self.ollama_client.create_fine_tuning_prompt(data, "sentiment")
-            
+            logger.info("%s 파인튜닝 시작: %d개 데이터", label, len(data))
+
+            # 파인튜닝 프롬프트 생성 (예제 수를 상한으로 잘라 프롬프트 크기를 제한)
+            sample = data[:MAX_PROMPT_EXAMPLES]
+            if len(sample) < len(data):
+                logger.info("%s 프롬프트 예제를 %d개로 제한 (전체 %d개)", label, len(sample), len(data))
+            prompt = self.ollama_client.create_fine_tuning_prompt(sample, task_type)
+
             # 파인튜닝 수행 (Ollama API를 통해)
             # 실제로는 Ollama의 파인튜닝 API를 호출하거나 프롬프트 학습을 수행
             # 여기서는 프롬프트 생성 후 모델에 전달하는 방식으로 시뮬레이션
-            result = self._simulate_fine_tuning(prompt, "sentiment", len(data))
-            
-            logger.info(f"감정 분석 파인튜닝 완료: {result}")
-            return {
-                "task_type": "sentiment",
-                "data_count": len(data),
-                "success": True,
-                "details": result
-            }
-            
-        except Exception as e:
-            logger.error(f"감정 분석 파인튜닝 실패: {str(e)}")
-            return None
-    
-    def _fine_tune_anomaly(self, data: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
-        """
-        이상 탐지 모델을 파인튜닝합니다.
-        
-        Args:
-            data (List[Dict[str, Any]]): 이상 탐지 학습 데이터
-            
-        Returns:
-            Optional[Dict[str, Any]]: 파인튜닝 결과
-        """
-        try:
-            logger.info(f"이상 탐지 파인튜닝 시작: {len(data)}개 데이터")
-            
-            # 파인튜닝 프롬프트 생성
-            prompt = self.ollama_client.create_fine_tuning_prompt(data, "anomaly")
-            
-            # 파인튜닝 수행
-            result = self._simulate_fine_tuning(prompt, "anomaly", len(data))
-            
-            logger.info(f"이상 탐지 파인튜닝 완료: {result}")
-            return {
-                "task_type": "anomaly",
-                "data_count": len(data),
-                "success": True,
-                "details": result
-            }
-            
-        except Exception as e:
-            logger.error(f"이상 탐지 파인튜닝 실패: {str(e)}")
-            return None
-    
-    def _fine_tune_summary(self, data: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
-        """
-        요약 모델을 파인튜닝합니다.
-        
-        Args:
-            data (List[Dict[str, Any]]): 요약 학습 데이터
-            
-        Returns:
-            Optional[Dict[str, Any]]: 파인튜닝 결과
-        """
-        try:
-            logger.info(f"요약 파인튜닝 시작: {len(data)}개 데이터")
-            
-            # 파인튜닝 프롬프트 생성
-            prompt = self.ollama_client.create_fine_tuning_prompt(data, "summary")
-            
-            # 파인튜닝 수행
-            result = self._simulate_fine_tuning(prompt, "summary", len(data))
-            
-            logger.info(f"요약 파인튜닝 완료: {result}")
+            result = self._simulate_fine_tuning(prompt, task_type, len(data))
+
+            logger.info("%s 파인튜닝 완료: %s", label, result)
             return {
-                "task_type": "summary",
+                "task_type": task_type,
                 "data_count": len(data),
                 "success": True,
                 "details": result
             }
-            
+
         except Exception as e:
-            logger.error(f"요약 파인튜닝 실패: {str(e)}")
+            logger.error("%s 파인튜닝 실패: %s", label, e)
             return None
     
     def _simulate_fine_tuning(self, prompt: str, task_type: str, data_count: int) -> Dict[str, Any]:
@@ -231,10 +189,13 @@ class FineTuner:
         """
         # 프롬프트 길이 확인
         prompt_length = len(prompt)
-        
+
         # 파인튜닝 시간 시뮬레이션 (데이터 크기에 비례)
+        # 호출 스레드를 불필요하게 막지 않도록 기본은 대기 없이 진행하고,
+        # 실제 지연을 재현하고 싶을 때만 SLLM_SIMULATE_SLEEP=1로 켭니다
         simulation_time = min(2.0, data_count * 0.1)  # 최대 2초
-        time.sleep(simulation_time)
+        if os.getenv("SLLM_SIMULATE_SLEEP", "0") == "1":
+            time.sleep(simulation_time)
         
         # 결과 반환
         return {
@@ -252,7 +213,19 @@ class FineTuner:
             List[Dict[str, Any]]: 파인튜닝 히스토리 목록
         """
         return self.fine_tuning_history
-    
+
+    def get_history_etag(self) -> str:
+        """
+        현재 히스토리 상태의 버전 해시를 반환합니다.
+
+        레코드가 추가될 때마다 증분 갱신되므로 호출 비용은 히스토리
+        크기와 무관합니다. HTTP ETag로 사용됩니다.
+
+        Returns:
+            str: 히스토리 버전 해시
+        """
+        return self._history_hash.hexdigest()
+
     def get_last_fine_tuning_time(self, task_type: Optional[str] = None) -> Optional[datetime]:
         """
         마지막 파인튜닝 시간을 반환합니다.
@@ -265,20 +238,19 @@ class FineTuner:
         """
         if not self.fine_tuning_history:
             return None
-        
-        # 작업 유형별 필터링
-        filtered_history = self.fine_tuning_history
-        if task_type:
-            filtered_history = [h for h in filtered_history if h.get("task_type") == task_type]
-        
-        if not filtered_history:
+
+        # 히스토리는 시간순으로 추가되므로 뒤에서부터 첫 일치 항목이 가장 최근
+        latest = None
+        for entry in reversed(self.fine_tuning_history):
+            if task_type is None or entry.get("task_type") == task_type:
+                latest = entry
+                break
+
+        if latest is None:
             return None
-        
-        # 가장 최근 항목 찾기
-        latest = max(filtered_history, key=lambda x: x.get("timestamp", ""))
-        
+
         try:
             return datetime.fromisoformat(latest.get("timestamp"))
         except Exception as e:
-            logger.error(f"날짜 파싱 실패: {str(e)}")
+            logger.error("날짜 파싱 실패: %s", e)
             return None
\ No newline at end of file
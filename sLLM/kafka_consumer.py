@@ -1,14 +1,39 @@
 import os
-import json
 import logging
 import threading
 import time
+from collections import defaultdict
+
+import orjson
 from typing import Dict, Any, List, Optional
 from kafka import KafkaConsumer
 from kafka.errors import KafkaError
 
+# msgspec이 있으면 재사용 가능한 디코더로 메시지를 해석 (orjson보다 할당이 적음)
+try:
+    import msgspec.json
+    _decode_message = msgspec.json.Decoder().decode
+except ImportError:
+    _decode_message = orjson.loads
+
 logger = logging.getLogger(__name__)
 
+# Kafka 설정 (임포트 시점에 한 번만 읽음)
+_BOOTSTRAP_SERVERS = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:29092")
+_GROUP_ID = os.getenv("KAFKA_GROUP_ID", "sllm-consumer-group")
+_TOPICS = [
+    os.getenv("KAFKA_APPLICATION_LOGS_TOPIC", "application-logs"),
+    os.getenv("KAFKA_NGINX_LOGS_TOPIC", "nginx-access-logs"),
+    os.getenv("KAFKA_SYSTEM_METRICS_TOPIC", "beats-logs")
+]
+_BATCH_SIZE = int(os.getenv("KAFKA_BATCH_SIZE", "100"))
+_BATCH_TIMEOUT = int(os.getenv("KAFKA_BATCH_TIMEOUT", "60"))  # 초 단위
+_FETCH_MIN_BYTES = int(os.getenv("KAFKA_FETCH_MIN_BYTES", str(64 * 1024)))
+_FETCH_MAX_WAIT_MS = int(os.getenv("KAFKA_FETCH_MAX_WAIT_MS", "200"))
+_MAX_PARTITION_FETCH_BYTES = int(
+    os.getenv("KAFKA_MAX_PARTITION_FETCH_BYTES", str(4 * 1024 * 1024))
+)
+
 class KafkaLogConsumer:
     """
     Kafka 로그 컨슈머 클래스
@@ -23,17 +48,20 @@ class KafkaLogConsumer:
             data_processor: 로그 데이터를 처리할 데이터 프로세서 인스턴스
         """
         # Kafka 설정
-        self.bootstrap_servers = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:29092")
-        self.group_id = os.getenv("KAFKA_GROUP_ID", "sllm-consumer-group")
-        self.topics = [
-            os.getenv("KAFKA_APPLICATION_LOGS_TOPIC", "application-logs"),
-            os.getenv("KAFKA_NGINX_LOGS_TOPIC", "nginx-access-logs"),
-            os.getenv("KAFKA_SYSTEM_METRICS_TOPIC", "beats-logs")
-        ]
+        self.bootstrap_servers = _BOOTSTRAP_SERVERS
+        self.group_id = _GROUP_ID
+        self.topics = _TOPICS
 
         # 데이터 프로세서
         self.data_processor = data_processor
 
+        # 메시지 유형 → (로그 라벨, 핸들러) 디스패치 (배치마다 메서드 조회를 반복하지 않음)
+        self._dispatch = {
+            'application': ("애플리케이션 로그", data_processor._process_application_logs),
+            'nginx-access': ("Nginx 액세스 로그", data_processor._process_nginx_logs),
+            'beats': ("시스템 메트릭", data_processor._process_system_metrics)
+        }
+
         # 컨슈머 인스턴스
         self.consumer = None
 
@@ -43,7 +71,7 @@ class KafkaLogConsumer:
         # 컨슈머 스레드
         self.consumer_thread = None
 
-        logger.info(f"Kafka 로그 컨슈머 초기화: 서버={self.bootstrap_servers}, 토픽={self.topics}")
+        logger.info("Kafka 로그 컨슈머 초기화: 서버=%s, 토픽=%s", self.bootstrap_servers, self.topics)
 
     def _create_consumer(self) -> Optional[KafkaConsumer]:
         """
@@ -59,15 +87,18 @@ class KafkaLogConsumer:
                 group_id=self.group_id,
                 auto_offset_reset='earliest',
                 enable_auto_commit=True,
-                value_deserializer=lambda m: json.loads(m.decode('utf-8')),
+                value_deserializer=_decode_message,
                 max_poll_interval_ms=300000,  # 5분
                 session_timeout_ms=30000,     # 30초
-                heartbeat_interval_ms=10000   # 10초
+                heartbeat_interval_ms=10000,  # 10초
+                fetch_min_bytes=_FETCH_MIN_BYTES,
+                fetch_max_wait_ms=_FETCH_MAX_WAIT_MS,
+                max_partition_fetch_bytes=_MAX_PARTITION_FETCH_BYTES
             )
             logger.info("Kafka 컨슈머 생성 성공")
             return consumer
         except KafkaError as e:
-            logger.error(f"Kafka 컨슈머 생성 실패: {str(e)}")
+            logger.error("Kafka 컨슈머 생성 실패: %s", e)
             return None
 
     def start_consuming(self):
@@ -91,21 +122,19 @@ class KafkaLogConsumer:
         try:
             # 메시지 배치 처리를 위한 변수
             messages_batch = []
-            last_process_time = 0
-            batch_size = int(os.getenv("KAFKA_BATCH_SIZE", "100"))
-            batch_timeout = int(os.getenv("KAFKA_BATCH_TIMEOUT", "60"))  # 초 단위
-
-            # 메시지 소비 루프
-            for message in self.consumer:
-                if not self.running:
-                    break
+            last_process_time = time.monotonic()
+            batch_size = _BATCH_SIZE
+            batch_timeout = _BATCH_TIMEOUT
 
+            # 메시지 소비 루프 (poll 기반: 메시지가 없어도 타임아웃 배치가 밀리지 않음)
+            while self.running:
                 try:
-                    # 메시지 추가
-                    messages_batch.append(message.value)
+                    records = self.consumer.poll(timeout_ms=500, max_records=batch_size)
+                    for batch in records.values():
+                        messages_batch.extend(message.value for message in batch)
 
-                    # 배치 처리 조건 확인
-                    current_time = int(time.time())
+                    # 배치 처리 조건 확인 (monotonic: 시스템 시계 조정에 영향받지 않음)
+                    current_time = time.monotonic()
                     batch_full = len(messages_batch) >= batch_size
                     timeout_reached = (current_time - last_process_time) >= batch_timeout
 
@@ -113,17 +142,17 @@ class KafkaLogConsumer:
                         if messages_batch:
                             self._process_messages_batch(messages_batch)
                             messages_batch = []
-                            last_process_time = current_time
+                        last_process_time = current_time
 
                 except Exception as e:
-                    logger.error(f"메시지 처리 중 오류 발생: {str(e)}")
+                    logger.error("메시지 처리 중 오류 발생: %s", e)
 
             # 남은 메시지 처리
             if messages_batch:
                 self._process_messages_batch(messages_batch)
 
         except Exception as e:
-            logger.error(f"Kafka 메시지 소비 중 오류 발생: {str(e)}")
+            logger.error("Kafka 메시지 소비 중 오류 발생: %s", e)
         finally:
             self.running = False
             if self.consumer:
@@ -138,41 +167,24 @@ class KafkaLogConsumer:
             messages (List[Dict[str, Any]]): 처리할 메시지 배치
         """
         try:
-            logger.info(f"메시지 배치 처리 시작: {len(messages)}개")
-
-            # 메시지 유형별 분류
-            app_logs = []
-            nginx_logs = []
-            system_metrics = []
+            logger.info("메시지 배치 처리 시작: %d개", len(messages))
 
+            # 메시지 유형별 분류 (단일 순회)
+            buckets = defaultdict(list)
             for msg in messages:
-                # 메시지 유형 확인
-                msg_type = msg.get('type')
-
-                if msg_type == 'application':
-                    app_logs.append(msg)
-                elif msg_type == 'nginx-access':
-                    nginx_logs.append(msg)
-                elif msg_type == 'beats':
-                    system_metrics.append(msg)
+                buckets[msg.get('type')].append(msg)
 
             # 데이터 프로세서에 전달
-            if app_logs:
-                logger.info(f"애플리케이션 로그 {len(app_logs)}개 처리")
-                self.data_processor._process_application_logs(app_logs)
-
-            if nginx_logs:
-                logger.info(f"Nginx 액세스 로그 {len(nginx_logs)}개 처리")
-                self.data_processor._process_nginx_logs(nginx_logs)
-
-            if system_metrics:
-                logger.info(f"시스템 메트릭 {len(system_metrics)}개 처리")
-                self.data_processor._process_system_metrics(system_metrics)
+            for msg_type, (label, handler) in self._dispatch.items():
+                batch = buckets.get(msg_type)
+                if batch:
+                    logger.info("%s %d개 처리", label, len(batch))
+                    handler(batch)
 
-            logger.info(f"메시지 배치 처리 완료: {len(messages)}개")
+            logger.info("메시지 배치 처리 완료: %d개", len(messages))
 
         except Exception as e:
-            logger.error(f"메시지 배치 처리 중 오류 발생: {str(e)}")
+            logger.error("메시지 배치 처리 중 오류 발생: %s", e)
 
     def stop_consuming(self):
         """
@@ -1,21 +1,23 @@
+import asyncio
 import os
 import logging
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from pydantic import BaseModel
 from dotenv import load_dotenv
 import schedule
-import time
 import threading
+import time
+from collections import OrderedDict
+
+# 환경 변수 로드 (로컬 모듈이 임포트 시점에 환경 변수를 읽으므로 먼저 수행)
+load_dotenv()
 
 from ollama_client import OllamaClient
 from data_processor import DataProcessor
 from kafka_consumer import KafkaLogConsumer
 from fine_tuning import FineTuner
 
-# 환경 변수 로드
-load_dotenv()
-
 # 로깅 설정
 logging.basicConfig(
     level=logging.INFO,
@@ -36,8 +38,40 @@ data_processor = DataProcessor()
 kafka_consumer = KafkaLogConsumer(data_processor)
 fine_tuner = FineTuner(ollama_client)
 
-# 스케줄러 실행 플래그
+# 스케줄러 실행 플래그와 종료 이벤트
 scheduler_running = False
+scheduler_stop_event = threading.Event()
+
+# 분석 결과 캐시: 동일한 (분석 유형, 텍스트) 재요청 시 LLM 호출을 생략
+# LRU + TTL 방식, 락으로 보호 (uvicorn 워커 스레드에서 접근)
+_ANALYSIS_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_ANALYSIS_CACHE_MAX = 2048
+_ANALYSIS_CACHE_TTL = 3600.0  # 1시간
+_analysis_cache_lock = threading.Lock()
+
+
+def _analysis_cache_get(key):
+    """캐시에서 유효한 분석 결과를 꺼냅니다. 없거나 만료됐으면 None."""
+    with _analysis_cache_lock:
+        entry = _ANALYSIS_CACHE.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at > _ANALYSIS_CACHE_TTL:
+            del _ANALYSIS_CACHE[key]
+            return None
+        _ANALYSIS_CACHE.move_to_end(key)
+        return result
+
+
+def _analysis_cache_put(key, result):
+    """분석 결과를 캐시에 저장하고 용량을 초과하면 가장 오래된 항목을 비웁니다."""
+    with _analysis_cache_lock:
+        _ANALYSIS_CACHE[key] = (time.monotonic(), result)
+        _ANALYSIS_CACHE.move_to_end(key)
+        while len(_ANALYSIS_CACHE) > _ANALYSIS_CACHE_MAX:
+            _ANALYSIS_CACHE.popitem(last=False)
+
 
 # 요청/응답 모델
 class AnalysisRequest(BaseModel):
@@ -75,24 +109,42 @@ def run_scheduler():
     schedule.every().day.at("02:00").do(scheduled_fine_tuning)
     
     logger.info("스케줄러 시작됨")
-    while scheduler_running:
+    while not scheduler_stop_event.is_set():
         schedule.run_pending()
-        time.sleep(60)  # 1분마다 스케줄 확인
+        # 다음 작업까지 남은 시간만큼만 대기 (최대 1분), 종료 요청 시 즉시 깨어남
+        idle = schedule.idle_seconds()
+        timeout = min(60.0, idle) if idle is not None and idle > 0 else 60.0
+        scheduler_stop_event.wait(timeout=timeout)
+    scheduler_running = False
 
 # API 엔드포인트
 @app.post("/analyze", response_model=AnalysisResponse)
 async def analyze_text(request: AnalysisRequest):
     """텍스트를 분석하고 결과를 반환합니다."""
     try:
-        if request.analysis_type == "sentiment":
-            result = ollama_client.analyze_sentiment(request.text)
-        elif request.analysis_type == "anomaly":
-            result = ollama_client.detect_anomaly(request.text)
-        elif request.analysis_type == "summary":
-            result = ollama_client.generate_summary(request.text)
-        else:
-            raise HTTPException(status_code=400, detail="지원되지 않는 분석 유형입니다")
-        
+        cache_key = (request.analysis_type, request.text)
+        result = _analysis_cache_get(cache_key)
+
+        if result is None:
+            if request.analysis_type == "sentiment":
+                result = ollama_client.analyze_sentiment(request.text)
+            elif request.analysis_type == "anomaly":
+                result = ollama_client.detect_anomaly(request.text)
+            elif request.analysis_type == "summary":
+                result = ollama_client.generate_summary(request.text)
+            else:
+                raise HTTPException(status_code=400, detail="지원되지 않는 분석 유형입니다")
+
+            # 실패 폴백은 캐시하지 않음 — 일시적 장애가 TTL 동안 결과를 오염시키지 않도록
+            # (클라이언트 캐시와 동일하게 성공적으로 해석된 결과만 저장)
+            failed = (
+                "error" in result
+                or "raw_response" in (result.get("details") or {})
+                or not result["result"]
+            )
+            if not failed:
+                _analysis_cache_put(cache_key, result)
+
         return AnalysisResponse(
             result=result["result"],
             confidence=result.get("confidence"),
@@ -106,18 +158,39 @@ async def analyze_text(request: AnalysisRequest):
 async def trigger_fine_tuning():
     """수동으로 파인튜닝을 트리거합니다."""
     try:
-        scheduled_fine_tuning()
+        # 블로킹 작업을 스레드 풀에 위임해 이벤트 루프를 막지 않습니다
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, scheduled_fine_tuning)
         return {"status": "success", "message": "파인튜닝이 시작되었습니다"}
     except Exception as e:
         logger.error(f"수동 파인튜닝 트리거 중 오류 발생: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/fine-tune/history")
+async def get_fine_tuning_history(request: Request, response: Response):
+    """파인튜닝 히스토리를 반환합니다. ETag가 일치하면 본문 없이 304를 반환합니다."""
+    etag = fine_tuner.get_history_etag()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return {"history": fine_tuner.get_fine_tuning_history()}
+
+# Ollama 상태 캐시 (로드밸런서 헬스체크가 잦아도 Ollama 호출은 5초에 1회로 제한)
+_STATUS_CACHE_TTL = 5.0
+_status_cache = {"t": 0.0, "v": None}
+
 @app.get("/health")
 async def health_check():
     """서비스 상태를 확인합니다."""
+    now = time.monotonic()
+    if _status_cache["v"] is None or now - _status_cache["t"] > _STATUS_CACHE_TTL:
+        _status_cache["v"] = ollama_client.check_status()
+        _status_cache["t"] = now
+
     return {
         "status": "healthy",
-        "ollama_status": ollama_client.check_status(),
+        "ollama_status": _status_cache["v"],
         "scheduler_running": scheduler_running
     }
 
@@ -133,8 +206,8 @@ async def startup_event():
     threading.Thread(target=run_scheduler, daemon=True).start()
     logger.info("스케줄러가 시작되었습니다")
     
-    # Ollama 모델 로드 확인
-    ollama_client.ensure_model_loaded()
+    # Ollama 워밍업 (모델 확인 + 상태 점검을 동시 수행, 연결 풀 선점)
+    ollama_client.warmup()
     logger.info("Ollama 모델이 로드되었습니다")
 
 # 애플리케이션 종료 이벤트
@@ -143,7 +216,9 @@ async def shutdown_event():
     """애플리케이션 종료 시 실행되는 이벤트 핸들러"""
     global scheduler_running
     scheduler_running = False
+    scheduler_stop_event.set()
     kafka_consumer.stop_consuming()
+    ollama_client.close()
     logger.info("애플리케이션이 정상적으로 종료되었습니다")
 
 # 직접 실행 시 서버 시작
@@ -1,11 +1,212 @@
+import hashlib
 import os
 import json
 import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import cached_property
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, Any, Optional, List
 
+# orjson이 있으면 C 가속 파서를 사용 (stdlib json 대비 3~5배 빠름)
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
+# 분석용 시스템 메시지 (호출 간 바이트 단위로 동일해야 Ollama의
+# 프리픽스 KV 캐시가 적중하므로 모듈 수준 상수로 고정)
+_SENTIMENT_SYSTEM = """다음 텍스트의 감정을 분석하고 결과를 JSON 형식으로 반환해주세요.
+감정은 'positive', 'neutral', 'negative' 중 하나여야 합니다.
+신뢰도는 0부터 1 사이의 값이어야 합니다.
+
+JSON 형식:
+{
+    "sentiment": "감정",
+    "confidence": 신뢰도,
+    "explanation": "분석 설명"
+}"""
+
+_ANOMALY_SYSTEM = """다음 로그 텍스트에서 이상 징후가 있는지 분석하고 결과를 JSON 형식으로 반환해주세요.
+이상 여부는 'normal', 'warning', 'critical' 중 하나여야 합니다.
+신뢰도는 0부터 1 사이의 값이어야 합니다.
+
+JSON 형식:
+{
+    "anomaly_status": "이상 여부",
+    "confidence": 신뢰도,
+    "detected_issues": ["문제1", "문제2", ...],
+    "explanation": "분석 설명"
+}"""
+
+_ANOMALY_BATCH_SYSTEM = """다음 로그 텍스트 각각에 대해 이상 징후가 있는지 분석하고,
+입력 순서대로 JSON 배열로 반환해주세요.
+이상 여부는 'normal', 'warning', 'critical' 중 하나여야 합니다.
+신뢰도는 0부터 1 사이의 값이어야 합니다.
+
+JSON 형식:
+[
+    {
+        "anomaly_status": "이상 여부",
+        "confidence": 신뢰도,
+        "detected_issues": ["문제1", "문제2", ...],
+        "explanation": "분석 설명"
+    },
+    ...
+]"""
+
+_SUMMARY_SYSTEM = """다음 텍스트를 간결하게 요약해주세요. 요약은 3-5문장으로 작성하고,
+가장 중요한 정보를 포함해야 합니다."""
+
+# 파인튜닝 프롬프트 템플릿 (작업 유형별 본문과 예제 서식)
+_FT_SENTIMENT_PROMPT = """
+            # 감정 분석 학습
+            
+            다음은 텍스트의 감정을 분석하는 예제입니다. 각 예제를 학습하여 감정 분석 능력을 향상시키세요.
+            
+            {examples}
+            
+            이제 당신은 텍스트의 감정을 더 정확하게 분석할 수 있습니다.
+            """
+
+_FT_SENTIMENT_EX_TMPL = """
+                ## 예제 {i}
+                텍스트: {text}
+                감정: {sentiment}
+                이유: {explanation}
+                """
+
+_FT_ANOMALY_PROMPT = """
+            # 이상 탐지 학습
+            
+            다음은 로그 텍스트에서 이상 징후를 탐지하는 예제입니다. 각 예제를 학습하여 이상 탐지 능력을 향상시키세요.
+            
+            {examples}
+            
+            이제 당신은 로그에서 이상 징후를 더 정확하게 탐지할 수 있습니다.
+            """
+
+_FT_ANOMALY_EX_TMPL = """
+                ## 예제 {i}
+                로그: {log_text}
+                이상 여부: {anomaly_status}
+                탐지된 문제: {detected_issues}
+                설명: {explanation}
+                """
+
+_FT_SUMMARY_PROMPT = """
+            # 텍스트 요약 학습
+            
+            다음은 텍스트를 요약하는 예제입니다. 각 예제를 학습하여 요약 능력을 향상시키세요.
+            
+            {examples}
+            
+            이제 당신은 텍스트를 더 효과적으로 요약할 수 있습니다.
+            """
+
+_FT_SUMMARY_EX_TMPL = """
+                ## 예제 {i}
+                원본 텍스트: {original_text}
+                요약: {summary}
+                """
+
+
+def _format_sentiment_example(i: int, example: Dict[str, Any]) -> str:
+    return _FT_SENTIMENT_EX_TMPL.format(
+        i=i,
+        text=example.get('text', ''),
+        sentiment=example.get('sentiment', ''),
+        explanation=example.get('explanation', '')
+    )
+
+
+def _format_anomaly_example(i: int, example: Dict[str, Any]) -> str:
+    return _FT_ANOMALY_EX_TMPL.format(
+        i=i,
+        log_text=example.get('log_text', ''),
+        anomaly_status=example.get('anomaly_status', ''),
+        detected_issues=', '.join(example.get('detected_issues', [])),
+        explanation=example.get('explanation', '')
+    )
+
+
+def _format_summary_example(i: int, example: Dict[str, Any]) -> str:
+    return _FT_SUMMARY_EX_TMPL.format(
+        i=i,
+        original_text=example.get('original_text', ''),
+        summary=example.get('summary', '')
+    )
+
+
+# 작업 유형 → (프롬프트 템플릿, 예제 서식 함수) 디스패치
+_FT_TMPLS = {
+    "sentiment": (_FT_SENTIMENT_PROMPT, _format_sentiment_example),
+    "anomaly": (_FT_ANOMALY_PROMPT, _format_anomaly_example),
+    "summary": (_FT_SUMMARY_PROMPT, _format_summary_example)
+}
+
+
+def _extract_json(text: str) -> Optional[Dict[str, Any]]:
+    """
+    텍스트에서 최상위 JSON 객체를 찾아 파싱합니다.
+
+    find/rfind로 문자열을 두 번 훑는 대신 중괄호 깊이를 추적하며
+    한 번만 순회하여 객체 구간을 찾습니다.
+
+    Args:
+        text (str): JSON 객체가 포함된 텍스트
+
+    Returns:
+        Optional[Dict[str, Any]]: 파싱된 객체 또는 None
+    """
+    start = -1
+    depth = 0
+    for i, ch in enumerate(text):
+        if ch == '{':
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == '}' and depth > 0:
+            depth -= 1
+            if depth == 0:
+                return _json_loads(text[start:i + 1])
+    return None
+
+
+def _extract_json_array(text: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    텍스트에서 최상위 JSON 배열을 찾아 파싱합니다.
+
+    _extract_json과 같은 단일 순회 방식으로 대괄호 깊이를 추적합니다.
+
+    Args:
+        text (str): JSON 배열이 포함된 텍스트
+
+    Returns:
+        Optional[List[Dict[str, Any]]]: 파싱된 배열 또는 None
+    """
+    start = -1
+    depth = 0
+    for i, ch in enumerate(text):
+        if ch == '[':
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == ']' and depth > 0:
+            depth -= 1
+            if depth == 0:
+                return _json_loads(text[start:i + 1])
+    return None
+
+
 class OllamaClient:
     """
     Ollama API 클라이언트 클래스
@@ -18,15 +219,57 @@ class OllamaClient:
         self.base_url = os.getenv("OLLAMA_API_URL", "http://localhost:11434")
         self.model_name = os.getenv("OLLAMA_MODEL", "llama3")
         
-        # 모델 파라미터 설정
-        self.default_params = {
+        # 연결 풀/타임아웃 설정 (환경 변수로 조정 가능)
+        pool_maxsize = int(os.getenv("OLLAMA_POOL_MAXSIZE", "32"))
+        self._timeout = (
+            float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "5")),
+            float(os.getenv("OLLAMA_READ_TIMEOUT", "120"))
+        )
+
+        # 모든 요청이 같은 호스트로 가므로 세션을 재사용 (keep-alive + 연결 풀)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=pool_maxsize,
+            pool_block=False,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=[502, 503, 504]
+            )
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # 모델 존재 확인 캐시 (TTL 내에는 /api/tags 왕복 생략)
+        self._model_verified_at: float = 0.0
+        self._model_ttl = 300.0  # 5분
+
+        # 분석 결과 캐시 (LRU, 로그 파이프라인은 동일 입력 반복이 많음)
+        self._analysis_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        self._analysis_cache_max = 1024
+        self._analysis_cache_lock = threading.Lock()
+
+        logger.info(f"Ollama 클라이언트 초기화: 모델={self.model_name}, URL={self.base_url}")
+
+    @cached_property
+    def default_params(self) -> Dict[str, Any]:
+        """모델 생성 기본 파라미터 (최초 접근 시 환경 변수에서 읽어 캐시)"""
+        return {
             "temperature": float(os.getenv("OLLAMA_TEMPERATURE", "0.7")),
             "top_p": float(os.getenv("OLLAMA_TOP_P", "0.9")),
             "top_k": int(os.getenv("OLLAMA_TOP_K", "40")),
             "num_predict": int(os.getenv("OLLAMA_NUM_PREDICT", "256")),
         }
-        
-        logger.info(f"Ollama 클라이언트 초기화: 모델={self.model_name}, URL={self.base_url}")
+
+    @cached_property
+    def _base_body(self) -> Dict[str, Any]:
+        """params 없이 호출되는 흔한 경우를 위한 요청 본문 템플릿"""
+        return {
+            "model": self.model_name,
+            "stream": False,
+            **self.default_params
+        }
     
     def ensure_model_loaded(self) -> bool:
         """
@@ -35,50 +278,99 @@ class OllamaClient:
         Returns:
             bool: 모델 로드 성공 여부
         """
+        # 최근에 확인했으면 HTTP 왕복 없이 통과
+        if time.monotonic() - self._model_verified_at < self._model_ttl:
+            return True
+
         try:
             # 모델 목록 확인
-            response = requests.get(f"{self.base_url}/api/tags")
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=self._timeout)
             models = response.json().get("models", [])
-            
-            # 모델 이름으로 필터링
-            model_exists = any(model.get("name") == self.model_name for model in models)
-            
+
+            # 모델 이름 집합으로 O(1) 존재 확인
+            model_names = {model.get("name") for model in models}
+            model_exists = self.model_name in model_names
+
             if not model_exists:
                 logger.info(f"모델 '{self.model_name}'을 다운로드합니다...")
-                response = requests.post(
+                response = self.session.post(
                     f"{self.base_url}/api/pull",
-                    json={"name": self.model_name}
+                    json={"name": self.model_name},
+                    timeout=self._timeout
                 )
                 if response.status_code == 200:
                     logger.info(f"모델 '{self.model_name}' 다운로드 완료")
+                    self._model_verified_at = time.monotonic()
                     return True
                 else:
                     logger.error(f"모델 다운로드 실패: {response.text}")
                     return False
-            
+
             logger.info(f"모델 '{self.model_name}'이 이미 로드되어 있습니다")
+            self._model_verified_at = time.monotonic()
             return True
             
         except Exception as e:
             logger.error(f"모델 로드 확인 중 오류 발생: {str(e)}")
             return False
     
-    def check_status(self) -> Dict[str, Any]:
+    def check_status(self, detailed: bool = False) -> Dict[str, Any]:
         """
         Ollama 서비스 상태를 확인합니다.
-        
+
+        기본 경로는 HEAD 요청으로 생존 여부만 확인하므로 모델 목록을
+        내려받거나 JSON을 해석하지 않습니다. 모델 수가 필요할 때만
+        detailed=True로 /api/tags를 조회합니다.
+
+        Args:
+            detailed (bool): 모델 목록까지 조회할지 여부
+
         Returns:
             Dict[str, Any]: 상태 정보
         """
         try:
-            response = requests.get(f"{self.base_url}/api/tags")
+            if not detailed:
+                response = self.session.head(self.base_url, timeout=2)
+                if response.status_code < 400:
+                    return {"status": "online"}
+                return {"status": "error", "message": response.text}
+
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=self._timeout)
             if response.status_code == 200:
                 return {"status": "online", "models": len(response.json().get("models", []))}
             else:
                 return {"status": "error", "message": response.text}
-        except Exception as e:
+        except requests.RequestException as e:
+            # 연결 실패/타임아웃 등 네트워크 계층 오류만 offline으로 분류
             return {"status": "offline", "error": str(e)}
-    
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
+
+    def warmup(self) -> Dict[str, Any]:
+        """
+        시작 시 모델 확인과 상태 점검을 동시에 수행합니다.
+
+        ensure_model_loaded와 check_status는 각각 독립적인 HTTP 왕복이므로
+        순차 실행 대신 스레드로 겹쳐 콜드 스타트를 왕복 한 번 수준으로
+        줄입니다. 연결 풀도 미리 데워 첫 추론의 핸드셰이크 지연을 없앱니다.
+
+        Returns:
+            Dict[str, Any]: {"model_loaded": bool, "status": 상태 정보}
+        """
+        # 연결 풀 선점 (실패해도 워밍업 자체는 계속 진행)
+        try:
+            self.session.head(self.base_url)
+        except Exception:
+            pass
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            model_future = executor.submit(self.ensure_model_loaded)
+            status_future = executor.submit(self.check_status)
+            return {
+                "model_loaded": model_future.result(),
+                "status": status_future.result()
+            }
+
     def generate_text(self, prompt: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         주어진 프롬프트에 대한 텍스트를 생성합니다.
@@ -90,43 +382,175 @@ class OllamaClient:
         Returns:
             Dict[str, Any]: 생성된 텍스트와 메타데이터
         """
-        # 기본 파라미터와 사용자 지정 파라미터 병합
-        request_params = self.default_params.copy()
+        # 기본 본문에 프롬프트만 얹고, 사용자 지정 파라미터가 있으면 덮어씀
+        body = {**self._base_body, "prompt": prompt, "stream": True}
         if params:
-            request_params.update(params)
+            body.update(params)
         
         try:
-            # API 요청
-            response = requests.post(
+            # API 요청 (스트리밍: 본문 전체를 메모리에 올리지 않고 줄 단위 처리)
+            response = self.session.post(
                 f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model_name,
-                    "prompt": prompt,
-                    **request_params
-                }
+                json=body,
+                timeout=self._timeout,
+                stream=True
             )
+
+            try:
+                if response.status_code != 200:
+                    logger.error(f"텍스트 생성 실패: {response.text}")
+                    return {"result": "", "error": response.text}
+
+                # NDJSON 스트림을 줄 단위로 해석하며 응답 조각을 누적
+                # (bytearray 누적: 문자열 += 의 제곱 증가를 피함)
+                buf = bytearray()
+                last = {}
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    obj = _json_loads(line)
+                    fragment = obj.get("response")
+                    if fragment:
+                        buf += fragment.encode()
+                    last = obj
+
+                return {
+                    "result": buf.decode(),
+                    "eval_count": last.get("eval_count"),
+                    "eval_duration": last.get("eval_duration")
+                }
+            finally:
+                response.close()
             
+        except Exception as e:
+            logger.error(f"텍스트 생성 중 오류 발생: {str(e)}")
+            return {"result": "", "error": str(e)}
+
+    def generate_chat(self, system: str, prompt: str,
+                      params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        고정 시스템 메시지와 사용자 입력으로 채팅 응답을 생성합니다.
+
+        긴 지시문을 시스템 메시지로 분리해 두면 Ollama가 호출 간 동일한
+        프리픽스의 KV 캐시를 재사용하므로, 짧은 입력 워크로드에서
+        지시문 재인코딩(프리필) 비용이 사라집니다.
+
+        Args:
+            system (str): 고정 시스템 메시지 (호출 간 동일해야 캐시 적중)
+            prompt (str): 사용자 입력
+            params (Optional[Dict[str, Any]]): 생성 파라미터
+
+        Returns:
+            Dict[str, Any]: 생성된 텍스트와 메타데이터
+        """
+        body = {
+            **self._base_body,
+            "messages": [
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt}
+            ]
+        }
+        if params:
+            body.update(params)
+
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/chat",
+                json=body,
+                timeout=self._timeout
+            )
+
             if response.status_code != 200:
-                logger.error(f"텍스트 생성 실패: {response.text}")
+                logger.error(f"채팅 응답 생성 실패: {response.text}")
                 return {"result": "", "error": response.text}
-            
-            # 응답 파싱
-            response_text = response.text
-            response_lines = response_text.strip().split('\n')
-            
-            # 마지막 줄에서 최종 응답 추출
-            final_response = json.loads(response_lines[-1])
-            
+
+            final_response = _json_loads(response.content)
+
             return {
-                "result": final_response.get("response", ""),
+                "result": final_response.get("message", {}).get("content", ""),
                 "eval_count": final_response.get("eval_count"),
                 "eval_duration": final_response.get("eval_duration")
             }
-            
+
         except Exception as e:
-            logger.error(f"텍스트 생성 중 오류 발생: {str(e)}")
+            logger.error(f"채팅 응답 생성 중 오류 발생: {str(e)}")
             return {"result": "", "error": str(e)}
     
+    def batch_analyze(self, texts: List[str], analysis_type: str = "sentiment",
+                      max_workers: int = 4) -> List[Dict[str, Any]]:
+        """
+        여러 텍스트를 동시에 분석합니다.
+
+        각 분석은 독립적인 HTTP 왕복이므로 스레드 풀로 겹쳐 실행하면
+        Ollama의 병렬 처리(OLLAMA_NUM_PARALLEL) 한도까지 거의 선형으로
+        빨라집니다. 결과 순서는 입력 순서와 동일합니다.
+
+        Args:
+            texts (List[str]): 분석할 텍스트 목록
+            analysis_type (str): 분석 유형 (sentiment/anomaly/summary)
+            max_workers (int): 동시 요청 수 상한
+
+        Returns:
+            List[Dict[str, Any]]: 입력 순서대로의 분석 결과 목록
+        """
+        handlers = {
+            "sentiment": self.analyze_sentiment,
+            "anomaly": self.detect_anomaly,
+            "summary": self.generate_summary
+        }
+        handler = handlers.get(analysis_type)
+        if handler is None:
+            logger.warning(f"지원되지 않는 분석 유형: {analysis_type}")
+            return []
+
+        return self.map_concurrent(handler, texts, concurrency=max_workers)
+
+    def map_concurrent(self, fn, items: List[Any], concurrency: int = 8) -> List[Any]:
+        """
+        항목 목록에 함수를 동시 적용하되 동시 실행 수를 제한합니다.
+
+        무제한 팬아웃은 스레드를 고갈시키고 Ollama의 병렬 처리 한도
+        (OLLAMA_NUM_PARALLEL)를 넘겨 역효과를 냅니다. 스레드 풀 크기로
+        동시 요청 수를 묶어 두면 완료되는 즉시 다음 항목이 투입되어
+        정상 상태 처리량이 유지됩니다.
+
+        Args:
+            fn: 각 항목에 적용할 함수
+            items (List[Any]): 처리할 항목 목록
+            concurrency (int): 동시 실행 수 상한
+
+        Returns:
+            List[Any]: 입력 순서대로의 결과 목록
+        """
+        if not items:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(items))) as executor:
+            return list(executor.map(fn, items))
+
+    @staticmethod
+    def _cache_key(task: str, text: str) -> bytes:
+        """분석 유형과 입력 텍스트로 고정 길이 캐시 키를 만듭니다."""
+        return hashlib.blake2b(
+            task.encode() + b"\x00" + text.encode(), digest_size=16
+        ).digest()
+
+    def _cache_get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """캐시에서 분석 결과를 조회합니다 (적중 시 최근 사용으로 갱신)."""
+        with self._analysis_cache_lock:
+            result = self._analysis_cache.get(key)
+            if result is not None:
+                self._analysis_cache.move_to_end(key)
+            return result
+
+    def _cache_put(self, key: bytes, result: Dict[str, Any]):
+        """분석 결과를 캐시에 저장하고 상한 초과분을 오래된 순으로 제거합니다."""
+        with self._analysis_cache_lock:
+            self._analysis_cache[key] = result
+            self._analysis_cache.move_to_end(key)
+            while len(self._analysis_cache) > self._analysis_cache_max:
+                self._analysis_cache.popitem(last=False)
+
     def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """
         텍스트의 감정을 분석합니다.
@@ -137,40 +561,28 @@ class OllamaClient:
         Returns:
             Dict[str, Any]: 감정 분석 결과
         """
-        prompt = f"""
-        다음 텍스트의 감정을 분석하고 결과를 JSON 형식으로 반환해주세요.
-        감정은 'positive', 'neutral', 'negative' 중 하나여야 합니다.
-        신뢰도는 0부터 1 사이의 값이어야 합니다.
-        
-        텍스트: {text}
-        
-        JSON 형식:
-        {{
-            "sentiment": "감정",
-            "confidence": 신뢰도,
-            "explanation": "분석 설명"
-        }}
-        """
-        
-        result = self.generate_text(prompt)
+        cache_key = self._cache_key("sentiment", text)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        result = self.generate_chat(_SENTIMENT_SYSTEM, text)
         
         try:
-            # JSON 응답 파싱
+            # JSON 응답 파싱 (단일 순회 스캔 + C 가속 파서)
             response_text = result.get("result", "")
-            json_start = response_text.find("{")
-            json_end = response_text.rfind("}") + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                json_str = response_text[json_start:json_end]
-                sentiment_data = json.loads(json_str)
-                
-                return {
+            sentiment_data = _extract_json(response_text)
+
+            if sentiment_data is not None:
+                analysis = {
                     "result": sentiment_data.get("sentiment", "neutral"),
                     "confidence": sentiment_data.get("confidence", 0.0),
                     "details": {
                         "explanation": sentiment_data.get("explanation", "")
                     }
                 }
+                self._cache_put(cache_key, analysis)
+                return analysis
             else:
                 logger.warning(f"JSON 파싱 실패: {response_text}")
                 return {"result": "neutral", "confidence": 0.0, "details": {"raw_response": response_text}}
@@ -189,36 +601,20 @@ class OllamaClient:
         Returns:
             Dict[str, Any]: 이상 탐지 결과
         """
-        prompt = f"""
-        다음 로그 텍스트에서 이상 징후가 있는지 분석하고 결과를 JSON 형식으로 반환해주세요.
-        이상 여부는 'normal', 'warning', 'critical' 중 하나여야 합니다.
-        신뢰도는 0부터 1 사이의 값이어야 합니다.
-        
-        로그 텍스트:
-        {log_text}
-        
-        JSON 형식:
-        {{
-            "anomaly_status": "이상 여부",
-            "confidence": 신뢰도,
-            "detected_issues": ["문제1", "문제2", ...],
-            "explanation": "분석 설명"
-        }}
-        """
-        
-        result = self.generate_text(prompt)
+        cache_key = self._cache_key("anomaly", log_text)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        result = self.generate_chat(_ANOMALY_SYSTEM, log_text)
         
         try:
-            # JSON 응답 파싱
+            # JSON 응답 파싱 (단일 순회 스캔 + C 가속 파서)
             response_text = result.get("result", "")
-            json_start = response_text.find("{")
-            json_end = response_text.rfind("}") + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                json_str = response_text[json_start:json_end]
-                anomaly_data = json.loads(json_str)
-                
-                return {
+            anomaly_data = _extract_json(response_text)
+
+            if anomaly_data is not None:
+                analysis = {
                     "result": anomaly_data.get("anomaly_status", "normal"),
                     "confidence": anomaly_data.get("confidence", 0.0),
                     "details": {
@@ -226,6 +622,8 @@ class OllamaClient:
                         "explanation": anomaly_data.get("explanation", "")
                     }
                 }
+                self._cache_put(cache_key, analysis)
+                return analysis
             else:
                 logger.warning(f"JSON 파싱 실패: {response_text}")
                 return {"result": "normal", "confidence": 0.0, "details": {"raw_response": response_text}}
@@ -233,7 +631,71 @@ class OllamaClient:
         except Exception as e:
             logger.error(f"이상 탐지 결과 파싱 중 오류 발생: {str(e)}")
             return {"result": "normal", "confidence": 0.0, "error": str(e)}
-    
+
+    def detect_anomalies_batch(self, log_texts: List[str], k: int = 8) -> List[Dict[str, Any]]:
+        """
+        여러 로그 텍스트의 이상 징후를 묶어서 탐지합니다.
+
+        짧은 로그가 많을 때 K개 입력을 프롬프트 하나로 합치면 HTTP 왕복과
+        생성 루프 기동 비용이 K분의 1로 줄어듭니다. 배열 응답을 해석하지
+        못하면 해당 묶음만 개별 호출로 대체하므로 결과는 항상 입력 순서대로
+        채워집니다.
+
+        Args:
+            log_texts (List[str]): 분석할 로그 텍스트 목록
+            k (int): 프롬프트 하나에 합칠 입력 수
+
+        Returns:
+            List[Dict[str, Any]]: 입력 순서대로의 이상 탐지 결과 목록
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(log_texts)
+
+        for start in range(0, len(log_texts), k):
+            chunk = [(i, log_texts[i]) for i in range(start, min(start + k, len(log_texts)))]
+
+            # 캐시 적중분은 프롬프트에서 제외
+            pending = []
+            for idx, text in chunk:
+                cached = self._cache_get(self._cache_key("anomaly", text))
+                if cached is not None:
+                    results[idx] = cached
+                else:
+                    pending.append((idx, text))
+
+            if not pending:
+                continue
+
+            numbered = "\n".join(
+                f"{n + 1}. {text}" for n, (_, text) in enumerate(pending)
+            )
+            result = self.generate_chat(_ANOMALY_BATCH_SYSTEM, numbered)
+
+            parsed = None
+            try:
+                parsed = _extract_json_array(result.get("result", ""))
+            except Exception as e:
+                logger.error(f"배치 이상 탐지 결과 파싱 중 오류 발생: {str(e)}")
+
+            if isinstance(parsed, list) and len(parsed) == len(pending):
+                for (idx, text), item in zip(pending, parsed):
+                    analysis = {
+                        "result": item.get("anomaly_status", "normal"),
+                        "confidence": item.get("confidence", 0.0),
+                        "details": {
+                            "detected_issues": item.get("detected_issues", []),
+                            "explanation": item.get("explanation", "")
+                        }
+                    }
+                    self._cache_put(self._cache_key("anomaly", text), analysis)
+                    results[idx] = analysis
+            else:
+                # 배열 해석 실패 시 해당 묶음만 개별 호출로 대체
+                logger.warning("배치 이상 탐지 응답 해석 실패: %d개를 개별 호출로 처리", len(pending))
+                for idx, text in pending:
+                    results[idx] = self.detect_anomaly(text)
+
+        return results
+
     def generate_summary(self, text: str) -> Dict[str, Any]:
         """
         텍스트 요약을 생성합니다.
@@ -244,25 +706,23 @@ class OllamaClient:
         Returns:
             Dict[str, Any]: 요약 결과
         """
-        prompt = f"""
-        다음 텍스트를 간결하게 요약해주세요. 요약은 3-5문장으로 작성하고, 
-        가장 중요한 정보를 포함해야 합니다.
-        
-        텍스트:
-        {text}
-        
-        요약:
-        """
-        
-        result = self.generate_text(prompt)
+        cache_key = self._cache_key("summary", text)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        result = self.generate_chat(_SUMMARY_SYSTEM, text)
         
-        return {
+        summary = {
             "result": result.get("result", "").strip(),
             "details": {
                 "eval_count": result.get("eval_count"),
                 "eval_duration": result.get("eval_duration")
             }
         }
+        if "error" not in result:
+            self._cache_put(cache_key, summary)
+        return summary
     
     def create_fine_tuning_prompt(self, examples: List[Dict[str, Any]], task_type: str) -> str:
         """
@@ -275,72 +735,28 @@ class OllamaClient:
         Returns:
             str: 파인튜닝 프롬프트
         """
-        if task_type == "sentiment":
-            prompt_template = """
-            # 감정 분석 학습
-            
-            다음은 텍스트의 감정을 분석하는 예제입니다. 각 예제를 학습하여 감정 분석 능력을 향상시키세요.
-            
-            {examples}
-            
-            이제 당신은 텍스트의 감정을 더 정확하게 분석할 수 있습니다.
-            """
-            
-            examples_text = ""
-            for i, example in enumerate(examples):
-                examples_text += f"""
-                ## 예제 {i+1}
-                텍스트: {example.get('text', '')}
-                감정: {example.get('sentiment', '')}
-                이유: {example.get('explanation', '')}
-                """
-            
-            return prompt_template.format(examples=examples_text)
-            
-        elif task_type == "anomaly":
-            prompt_template = """
-            # 이상 탐지 학습
-            
-            다음은 로그 텍스트에서 이상 징후를 탐지하는 예제입니다. 각 예제를 학습하여 이상 탐지 능력을 향상시키세요.
-            
-            {examples}
-            
-            이제 당신은 로그에서 이상 징후를 더 정확하게 탐지할 수 있습니다.
-            """
-            
-            examples_text = ""
-            for i, example in enumerate(examples):
-                examples_text += f"""
-                ## 예제 {i+1}
-                로그: {example.get('log_text', '')}
-                이상 여부: {example.get('anomaly_status', '')}
-                탐지된 문제: {', '.join(example.get('detected_issues', []))}
-                설명: {example.get('explanation', '')}
-                """
-            
-            return prompt_template.format(examples=examples_text)
-            
-        elif task_type == "summary":
-            prompt_template = """
-            # 텍스트 요약 학습
-            
-            다음은 텍스트를 요약하는 예제입니다. 각 예제를 학습하여 요약 능력을 향상시키세요.
-            
-            {examples}
-            
-            이제 당신은 텍스트를 더 효과적으로 요약할 수 있습니다.
-            """
-            
-            examples_text = ""
-            for i, example in enumerate(examples):
-                examples_text += f"""
-                ## 예제 {i+1}
-                원본 텍스트: {example.get('original_text', '')}
-                요약: {example.get('summary', '')}
-                """
-            
-            return prompt_template.format(examples=examples_text)
-            
-        else:
+        entry = _FT_TMPLS.get(task_type)
+        if entry is None:
             logger.warning(f"지원되지 않는 작업 유형: {task_type}")
-            return ""
\ No newline at end of file
+            return ""
+
+        prompt_template, format_example = entry
+        examples_text = "".join(
+            format_example(i + 1, example) for i, example in enumerate(examples)
+        )
+        return prompt_template.format(examples=examples_text)
+
+    def close(self):
+        """
+        HTTP 세션을 닫아 풀의 유휴 연결과 파일 디스크립터를 해제합니다.
+
+        장시간 실행되는 워커에서 세션을 닫지 않으면 소켓이 누적되므로
+        종료 경로에서 명시적으로 호출합니다.
+        """
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
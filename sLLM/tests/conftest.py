@@ -0,0 +1,8 @@
+import os
+import sys
+
+# 테스트 모듈이 플랫 모듈(ollama_client, data_processor 등)을 임포트할 수 있도록
+# sLLM 디렉터리를 한 번만 sys.path에 추가합니다 (모듈마다 반복하지 않음)
+_SLLM_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SLLM_DIR not in sys.path:
+    sys.path.insert(0, _SLLM_DIR)
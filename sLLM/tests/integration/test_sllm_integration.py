@@ -1,57 +1,96 @@
 import unittest
 import os
-import sys
 import json
 from unittest.mock import patch, MagicMock
 import requests
-
-# Add the parent directory to the path so we can import the modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from requests.adapters import BaseAdapter
 
 from ollama_client import OllamaClient
 from data_processor import DataProcessor
 
+
+class _FakeOllamaTransport(BaseAdapter):
+    """
+    In-process transport mounted on the client session so Ollama tests skip
+    both the network and per-call MagicMock patching. Responses are looked up
+    in a registry and sent requests are recorded for assertions.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.responses = {}
+        self.sent = []
+
+    def register(self, method, url, status=200, content=b""):
+        self.responses[(method.upper(), url)] = (status, content)
+
+    def send(self, request, **kwargs):
+        self.sent.append(request)
+        key = (request.method, request.url)
+        if key not in self.responses:
+            key = (request.method, request.url.rstrip("/"))
+        status, content = self.responses.get(key, (404, b""))
+        response = requests.Response()
+        response.status_code = status
+        response._content = content
+        response._content_consumed = True  # iter_lines가 _content를 재생하도록
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
 class TestSLLMIntegration(unittest.TestCase):
     
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         # Set environment variables for testing
-        os.environ["ELASTICSEARCH_HOST"] = "localhost"
-        os.environ["ELASTICSEARCH_PORT"] = "9200"
-        os.environ["OLLAMA_API_URL"] = "http://localhost:11434"
-        os.environ["OLLAMA_MODEL"] = "llama3"
-        
-        # Initialize components
-        self.ollama_client = OllamaClient()
-        self.data_processor = DataProcessor()
+        # (patch.dict restores the original environment on stop)
+        cls._env_patcher = patch.dict(os.environ, {
+            "ELASTICSEARCH_HOST": "localhost",
+            "ELASTICSEARCH_PORT": "9200",
+            "OLLAMA_API_URL": "http://localhost:11434",
+            "OLLAMA_MODEL": "llama3"
+        })
+        cls._env_patcher.start()
+        
+        # Initialize components once for the whole class
+        cls.ollama_client = OllamaClient()
+        cls.data_processor = DataProcessor()
+        
+        # Route all Ollama HTTP traffic through the in-process fake transport
+        cls.transport = _FakeOllamaTransport()
+        cls.ollama_client.session.mount("http://", cls.transport)
+    
+    @classmethod
+    def tearDownClass(cls):
+        # Release the shared client's pooled connections
+        cls.ollama_client.close()
+        cls._env_patcher.stop()
     
-    def tearDown(self):
-        # Clean up environment variables
-        for var in ["ELASTICSEARCH_HOST", "ELASTICSEARCH_PORT", "OLLAMA_API_URL", "OLLAMA_MODEL"]:
-            if var in os.environ:
-                del os.environ[var]
+    def setUp(self):
+        # Reset shared-client state so tests stay independent
+        self.ollama_client._analysis_cache.clear()
+        self.ollama_client._model_verified_at = 0.0
+        self.transport.responses.clear()
+        self.transport.sent.clear()
     
-    @patch('elasticsearch.Elasticsearch')
-    @patch('requests.get')
-    def test_elasticsearch_connection(self, mock_requests_get, mock_es):
+    def test_elasticsearch_connection(self):
         """Test that the data processor can connect to Elasticsearch"""
-        # Mock Elasticsearch client
+        # Mock Elasticsearch client (narrow scope: only around construction)
         mock_es_instance = MagicMock()
-        mock_es.return_value = mock_es_instance
-        
-        # Mock successful connection
         mock_es_instance.info.return_value = {"version": {"number": "7.10.0"}}
         
-        # Create a new data processor to test the connection
-        data_processor = DataProcessor()
+        with patch('elasticsearch.Elasticsearch', return_value=mock_es_instance):
+            # Create a new data processor to test the connection
+            data_processor = DataProcessor()
         
         # Assert that the Elasticsearch client was created
         self.assertIsNotNone(data_processor.es_client)
         
-        # Mock Ollama status check
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"models": [{"name": "llama3"}]}
-        mock_requests_get.return_value = mock_response
+        # Register Ollama status response (liveness path uses HEAD)
+        self.transport.register("HEAD", "http://localhost:11434")
         
         # Check Ollama status
         status = self.ollama_client.check_status()
@@ -59,14 +98,15 @@ class TestSLLMIntegration(unittest.TestCase):
         # Assert that Ollama is online
         self.assertEqual(status["status"], "online")
     
-    @patch('requests.post')
-    def test_ollama_text_generation(self, mock_post):
+    def test_ollama_text_generation(self):
         """Test that the Ollama client can generate text"""
-        # Mock successful response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.text = '{"response":"This is a test response","eval_count":100,"eval_duration":1.5}'
-        mock_post.return_value = mock_response
+        # Register successful response
+        self.transport.register(
+            "POST", "http://localhost:11434/api/generate",
+            content=json.dumps({
+                "response": "This is a test response", "eval_count": 100, "eval_duration": 1.5
+            }).encode()
+        )
         
         # Generate text
         result = self.ollama_client.generate_text("Test prompt")
@@ -76,21 +116,28 @@ class TestSLLMIntegration(unittest.TestCase):
         self.assertEqual(result["eval_count"], 100)
         self.assertEqual(result["eval_duration"], 1.5)
         
-        # Verify the request
-        mock_post.assert_called_once()
-        args, kwargs = mock_post.call_args
-        self.assertEqual(args[0], "http://localhost:11434/api/generate")
-        self.assertEqual(kwargs["json"]["model"], "llama3")
-        self.assertEqual(kwargs["json"]["prompt"], "Test prompt")
+        # Verify the request that went through the transport
+        self.assertEqual(len(self.transport.sent), 1)
+        sent = self.transport.sent[0]
+        self.assertEqual(sent.url, "http://localhost:11434/api/generate")
+        body = json.loads(sent.body)
+        self.assertEqual(body["model"], "llama3")
+        self.assertEqual(body["prompt"], "Test prompt")
     
-    @patch('requests.post')
-    def test_sentiment_analysis(self, mock_post):
+    def test_sentiment_analysis(self):
         """Test sentiment analysis integration"""
-        # Mock successful response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.text = '{"response":"{\\"sentiment\\": \\"positive\\", \\"confidence\\": 0.85, \\"explanation\\": \\"The text contains positive words.\\"}","eval_count":100,"eval_duration":1.5}'
-        mock_post.return_value = mock_response
+        # Register successful chat response (analyzers use /api/chat)
+        self.transport.register(
+            "POST", "http://localhost:11434/api/chat",
+            content=json.dumps({
+                "message": {
+                    "role": "assistant",
+                    "content": '{"sentiment": "positive", "confidence": 0.85, "explanation": "The text contains positive words."}'
+                },
+                "eval_count": 100,
+                "eval_duration": 1.5
+            }).encode()
+        )
         
         # Analyze sentiment
         result = self.ollama_client.analyze_sentiment("This is a great day!")
@@ -100,12 +147,10 @@ class TestSLLMIntegration(unittest.TestCase):
         self.assertEqual(result["confidence"], 0.85)
         self.assertEqual(result["details"]["explanation"], "The text contains positive words.")
     
-    @patch('elasticsearch.Elasticsearch')
-    def test_data_processing_flow(self, mock_es):
+    def test_data_processing_flow(self):
         """Test the data processing flow"""
-        # Mock Elasticsearch client
+        # Mock Elasticsearch client (patched narrowly where used below)
         mock_es_instance = MagicMock()
-        mock_es.return_value = mock_es_instance
         
         # Mock search results for application logs
         app_logs = [
@@ -141,15 +186,28 @@ class TestSLLMIntegration(unittest.TestCase):
             }
         ]
         
-        # Mock search responses
-        mock_es_instance.search.side_effect = [
-            {"hits": {"hits": [{"_source": log} for log in app_logs]}},
-            {"hits": {"hits": [{"_source": log} for log in nginx_logs]}},
-            {"hits": {"hits": [{"_source": log} for log in system_metrics]}}
+        # Mock search_after responses, routed by the queried index pattern
+        source_hits = [
+            ("application-logs", app_logs),
+            ("nginx-access", nginx_logs),
+            ("system-metrics", system_metrics)
         ]
+
+        def search_response(index=None, **kwargs):
+            hits = []
+            for prefix, logs in source_hits:
+                if prefix in (index or ""):
+                    hits.extend(
+                        {"_index": f"{prefix}-2023.01.01", "_source": log}
+                        for log in logs
+                    )
+            return {"hits": {"hits": hits}}
+
+        mock_es_instance.search.side_effect = search_response
         
         # Create a new data processor with the mocked Elasticsearch client
-        data_processor = DataProcessor()
+        with patch('elasticsearch.Elasticsearch', return_value=mock_es_instance):
+            data_processor = DataProcessor()
         data_processor.es_client = mock_es_instance
         
         # Process logs
@@ -165,7 +223,7 @@ class TestSLLMIntegration(unittest.TestCase):
         self.assertGreater(len(anomaly_data), 0)
         
         # Verify that Elasticsearch was queried
-        self.assertEqual(mock_es_instance.search.call_count, 3)
+        self.assertGreaterEqual(mock_es_instance.search.call_count, 1)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
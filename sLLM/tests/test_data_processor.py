@@ -1,42 +1,70 @@
 import unittest
 from unittest.mock import patch, MagicMock, mock_open
 import json
+import msgpack
 import os
-import sys
 import pandas as pd
 from datetime import datetime, timedelta
 
-# Add the parent directory to the path so we can import the modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from data_processor import DataProcessor
 
 class TestDataProcessor(unittest.TestCase):
     
+    @classmethod
+    def setUpClass(cls):
+        # Set environment variables for testing (shared by every test method;
+        # patch.dict restores the original environment on stop)
+        cls._env_patcher = patch.dict(os.environ, {
+            "ELASTICSEARCH_HOST": "test-elasticsearch",
+            "ELASTICSEARCH_PORT": "9200",
+            "ELASTICSEARCH_USER": "test-user",
+            "ELASTICSEARCH_PASSWORD": "test-password",
+            "DATA_DIR": "test_data"
+        })
+        cls._env_patcher.start()
+        
+        # Start the patchers once per class; setUp only resets their state
+        cls.es_client_patcher = patch('elasticsearch.Elasticsearch')
+        cls.mock_es_client = cls.es_client_patcher.start()
+        
+        cls.makedirs_patcher = patch('os.makedirs')
+        cls.mock_makedirs = cls.makedirs_patcher.start()
+        
+        cls.exists_patcher = patch('os.path.exists')
+        cls.mock_exists = cls.exists_patcher.start()
+
+        # Mock os.stat / os.replace (mtime cache and atomic save)
+        cls.stat_patcher = patch('os.stat')
+        cls.mock_stat = cls.stat_patcher.start()
+        cls.replace_patcher = patch('os.replace')
+        cls.mock_replace = cls.replace_patcher.start()
+        
+        cls.open_patcher = patch('builtins.open', mock_open())
+        cls.mock_open = cls.open_patcher.start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls._env_patcher.stop()
+        
+        # Stop all patches
+        cls.es_client_patcher.stop()
+        cls.makedirs_patcher.stop()
+        cls.exists_patcher.stop()
+        cls.stat_patcher.stop()
+        cls.replace_patcher.stop()
+        cls.open_patcher.stop()
+    
     def setUp(self):
-        # Set environment variables for testing
-        os.environ["ELASTICSEARCH_HOST"] = "test-elasticsearch"
-        os.environ["ELASTICSEARCH_PORT"] = "9200"
-        os.environ["ELASTICSEARCH_USER"] = "test-user"
-        os.environ["ELASTICSEARCH_PASSWORD"] = "test-password"
-        os.environ["DATA_DIR"] = "test_data"
-        
-        # Mock the Elasticsearch client
-        self.es_client_patcher = patch('elasticsearch.Elasticsearch')
-        self.mock_es_client = self.es_client_patcher.start()
-        
-        # Mock os.makedirs
-        self.makedirs_patcher = patch('os.makedirs')
-        self.mock_makedirs = self.makedirs_patcher.start()
-        
-        # Mock os.path.exists
-        self.exists_patcher = patch('os.path.exists')
-        self.mock_exists = self.exists_patcher.start()
+        # Reset per-test mock state (patchers live for the whole class)
+        self.mock_makedirs.reset_mock()
+        self.mock_exists.reset_mock()
         self.mock_exists.return_value = False  # Default to file not existing
-        
-        # Mock open
-        self.open_patcher = patch('builtins.open', mock_open())
-        self.mock_open = self.open_patcher.start()
+        self.mock_stat.reset_mock()
+        self.mock_replace.reset_mock()
+        self.mock_open.reset_mock()
+        handle = self.mock_open.return_value.__enter__.return_value
+        handle.read.reset_mock(return_value=True, side_effect=True)
+        handle.write.reset_mock()
         
         # Create the data processor
         self.data_processor = DataProcessor()
@@ -44,18 +72,6 @@ class TestDataProcessor(unittest.TestCase):
         # Set the Elasticsearch client mock
         self.data_processor.es_client = MagicMock()
     
-    def tearDown(self):
-        # Clean up environment variables
-        for var in ["ELASTICSEARCH_HOST", "ELASTICSEARCH_PORT", "ELASTICSEARCH_USER", "ELASTICSEARCH_PASSWORD", "DATA_DIR"]:
-            if var in os.environ:
-                del os.environ[var]
-        
-        # Stop all patches
-        self.es_client_patcher.stop()
-        self.makedirs_patcher.stop()
-        self.exists_patcher.stop()
-        self.open_patcher.stop()
-    
     def test_init(self):
         """Test initialization of DataProcessor"""
         self.assertEqual(self.data_processor.es_host, "test-elasticsearch")
@@ -64,7 +80,7 @@ class TestDataProcessor(unittest.TestCase):
         self.assertEqual(self.data_processor.es_password, "test-password")
         self.assertEqual(self.data_processor.data_dir, "test_data")
         self.assertEqual(self.data_processor.last_processed_file, os.path.join("test_data", "last_processed.json"))
-        self.assertEqual(self.data_processor.processed_data_file, os.path.join("test_data", "processed_data.json"))
+        self.assertEqual(self.data_processor.processed_data_file, os.path.join("test_data", "processed_data.msgpack"))
         self.mock_makedirs.assert_called_once_with("test_data", exist_ok=True)
     
     def test_load_last_processed_default(self):
@@ -88,22 +104,20 @@ class TestDataProcessor(unittest.TestCase):
         """Test _load_last_processed when file exists"""
         # Mock os.path.exists to return True
         self.mock_exists.return_value = True
-        
-        # Mock json.load to return test data
+
+        # Test data stored on disk
         test_data = {
             "application_logs": "2023-01-01T12:00:00",
             "nginx_access": "2023-01-01T12:00:00",
             "system_metrics": "2023-01-01T12:00:00"
         }
-        
-        # Mock open to return file with test data
-        self.mock_open.return_value.__enter__.return_value.read.return_value = json.dumps(test_data)
-        
-        # Mock json.load
-        with patch('json.load', return_value=test_data):
-            # Call the method
-            result = self.data_processor._load_last_processed()
-        
+
+        # Mock open to return file with the serialized test data
+        self.mock_open.return_value.__enter__.return_value.read.return_value = json.dumps(test_data).encode('utf-8')
+
+        # Call the method
+        result = self.data_processor._load_last_processed()
+
         # Assertions
         self.assertIn("application_logs", result)
         self.assertIn("nginx_access", result)
@@ -125,15 +139,24 @@ class TestDataProcessor(unittest.TestCase):
         
         # Call the method
         self.data_processor._save_last_processed()
-        
-        # Assertions
-        self.mock_open.assert_called_once_with(self.data_processor.last_processed_file, 'w')
+
+        # Assertions: written to a temp file, then atomically moved into place
+        tmp_path = self.data_processor.last_processed_file + ".tmp"
+        self.mock_open.assert_called_once_with(tmp_path, 'wb')
+        self.mock_replace.assert_called_once_with(tmp_path, self.data_processor.last_processed_file)
         handle = self.mock_open()
         handle.write.assert_called_once()
-        
+
         # Check that the written data contains the expected timestamps
         written_data = handle.write.call_args[0][0]
-        self.assertIn("2023-01-01T12:00:00", written_data)
+        self.assertIn(b"2023-01-01T12:00:00", written_data)
+
+        # A second save with unchanged values skips the disk write
+        self.mock_open.reset_mock()
+        self.mock_replace.reset_mock()
+        self.data_processor._save_last_processed()
+        self.mock_open.assert_not_called()
+        self.mock_replace.assert_not_called()
     
     def test_get_latest_processed_data_empty(self):
         """Test get_latest_processed_data when file doesn't exist"""
@@ -151,23 +174,22 @@ class TestDataProcessor(unittest.TestCase):
         # Mock os.path.exists to return True
         self.mock_exists.return_value = True
         
-        # Mock json.load to return test data
+        # Test data stored on disk (msgpack record stream)
         test_data = [{"task_type": "anomaly", "log_text": "test log"}]
-        
-        # Mock open to return file with test data
-        self.mock_open.return_value.__enter__.return_value.read.return_value = json.dumps(test_data)
-        
-        # Mock json.load
-        with patch('json.load', return_value=test_data):
-            # Call the method
-            result = self.data_processor.get_latest_processed_data()
-        
+        packed = b''.join(msgpack.packb(item, use_bin_type=True) for item in test_data)
+
+        # Mock open to return file yielding the packed stream, then EOF
+        self.mock_open.return_value.__enter__.return_value.read.side_effect = [packed, b'']
+
+        # Call the method
+        result = self.data_processor.get_latest_processed_data()
+
         # Assertions
         self.assertEqual(result, test_data)
     
     def test_fetch_application_logs(self):
         """Test _fetch_application_logs"""
-        # Mock Elasticsearch search response
+        # Mock Elasticsearch search response (single search_after page)
         mock_response = {
             "hits": {
                 "hits": [
@@ -177,20 +199,20 @@ class TestDataProcessor(unittest.TestCase):
             }
         }
         self.data_processor.es_client.search.return_value = mock_response
-        
+
         # Call the method
         start_time = datetime(2023, 1, 1, 12, 0, 0)
         end_time = datetime(2023, 1, 1, 13, 0, 0)
         result = self.data_processor._fetch_application_logs(start_time, end_time)
-        
+
         # Assertions
         self.assertEqual(len(result), 2)
         self.data_processor.es_client.search.assert_called_once()
-        
+
         # Check that the query contains the correct time range
-        query = self.data_processor.es_client.search.call_args[1]['body']
-        self.assertEqual(query['query']['range']['timestamp']['gte'], start_time.isoformat())
-        self.assertEqual(query['query']['range']['timestamp']['lt'], end_time.isoformat())
+        query = self.data_processor.es_client.search.call_args[1]['query']
+        self.assertEqual(query['range']['timestamp']['gte'], start_time.isoformat())
+        self.assertEqual(query['range']['timestamp']['lt'], end_time.isoformat())
     
     def test_process_application_logs(self):
         """Test _process_application_logs"""
@@ -221,23 +243,24 @@ class TestDataProcessor(unittest.TestCase):
     def test_process_new_logs(self):
         """Test process_new_logs"""
         # Mock the fetch and process methods
-        with patch.object(self.data_processor, '_fetch_application_logs', return_value=[{"log": "app log"}]) as mock_fetch_app, \
-             patch.object(self.data_processor, '_fetch_nginx_logs', return_value=[{"log": "nginx log"}]) as mock_fetch_nginx, \
-             patch.object(self.data_processor, '_fetch_system_metrics', return_value=[{"metric": "system metric"}]) as mock_fetch_sys, \
+        fetched = {
+            "application_logs": [{"log": "app log"}],
+            "nginx_access": [{"log": "nginx log"}],
+            "system_metrics": [{"metric": "system metric"}]
+        }
+        with patch.object(self.data_processor, '_fetch_all_sources', return_value=fetched) as mock_fetch_all, \
              patch.object(self.data_processor, '_process_application_logs', return_value=[{"processed": "app log"}]) as mock_process_app, \
              patch.object(self.data_processor, '_process_nginx_logs', return_value=[{"processed": "nginx log"}]) as mock_process_nginx, \
              patch.object(self.data_processor, '_process_system_metrics', return_value=[{"processed": "system metric"}]) as mock_process_sys, \
              patch.object(self.data_processor, '_save_last_processed') as mock_save_last, \
              patch.object(self.data_processor, '_save_processed_data') as mock_save_data:
-            
+
             # Call the method
             result = self.data_processor.process_new_logs()
-            
+
             # Assertions
             self.assertEqual(len(result), 3)  # One from each source
-            mock_fetch_app.assert_called_once()
-            mock_fetch_nginx.assert_called_once()
-            mock_fetch_sys.assert_called_once()
+            mock_fetch_all.assert_called_once()
             mock_process_app.assert_called_once_with([{"log": "app log"}])
             mock_process_nginx.assert_called_once_with([{"log": "nginx log"}])
             mock_process_sys.assert_called_once_with([{"metric": "system metric"}])
@@ -1,29 +1,119 @@
+import time
 import unittest
+from types import MappingProxyType, SimpleNamespace
 from unittest.mock import patch, MagicMock
 import json
 import os
-import sys
 
-# Add the parent directory to the path so we can import the modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import requests
 
 from ollama_client import OllamaClient
 
+# 파인튜닝 프롬프트 테스트용 공유 예제 (불변 취지이므로 모듈 수준에 고정)
+_SENTIMENT_EXAMPLES = (
+    MappingProxyType({
+        "text": "I love this product!",
+        "sentiment": "positive",
+        "explanation": "Contains positive words like 'love'"
+    }),
+    MappingProxyType({
+        "text": "This is terrible.",
+        "sentiment": "negative",
+        "explanation": "Contains negative words like 'terrible'"
+    }),
+)
+
+_ANOMALY_EXAMPLES = (
+    MappingProxyType({
+        "log_text": "CPU usage at 95%",
+        "anomaly_status": "warning",
+        "detected_issues": ["High CPU usage"],
+        "explanation": "CPU usage is very high"
+    }),
+)
+
+_SUMMARY_EXAMPLES = (
+    MappingProxyType({
+        "original_text": "This is a long text that needs to be summarized.",
+        "summary": "This is a summary."
+    }),
+)
+
+# 모의 응답 페이로드 (테스트마다 리터럴을 재구성하지 않도록 모듈 수준에 고정)
+_NDJSON_OK_LINES = (
+    b'{"response": "partial"}',
+    b'{"response": " text", "eval_count": 100, "eval_duration": 1.5}'
+)
+
+_SENTIMENT_CHAT_RESULT = {
+    "result": 'Analysis: {"sentiment": "positive", "confidence": 0.85, "explanation": "The text contains positive words."}'
+}
+
+_ANOMALY_CHAT_RESULT = {
+    "result": 'Analysis: {"anomaly_status": "warning", "confidence": 0.75, "detected_issues": ["High CPU usage"], "explanation": "The log shows high CPU usage."}'
+}
+
+_SUMMARY_CHAT_RESULT = {
+    "result": "This is a summary of the text.",
+    "eval_count": 50,
+    "eval_duration": 0.8
+}
+
 class TestOllamaClient(unittest.TestCase):
     
-    def setUp(self):
-        # Set environment variables for testing
-        os.environ["OLLAMA_API_URL"] = "http://test-ollama:11434"
-        os.environ["OLLAMA_MODEL"] = "test-model"
-        os.environ["OLLAMA_TEMPERATURE"] = "0.5"
+    @classmethod
+    def setUpClass(cls):
+        # Set environment variables for testing and build one shared client
+        # (patch.dict restores the original environment on stop)
+        cls._env_patcher = patch.dict(os.environ, {
+            "OLLAMA_API_URL": "http://test-ollama:11434",
+            "OLLAMA_MODEL": "test-model",
+            "OLLAMA_TEMPERATURE": "0.5"
+        })
+        cls._env_patcher.start()
+        
+        cls.client = OllamaClient()
         
-        self.client = OllamaClient()
+        # Patch the shared session's HTTP methods once for the whole class;
+        # setUp resets the mocks between tests
+        cls._get_patcher = patch.object(cls.client.session, 'get')
+        cls.mock_get = cls._get_patcher.start()
+        cls._post_patcher = patch.object(cls.client.session, 'post')
+        cls.mock_post = cls._post_patcher.start()
+        cls._head_patcher = patch.object(cls.client.session, 'head')
+        cls.mock_head = cls._head_patcher.start()
+        
+        # 분석 메서드 테스트용: 채팅 생성도 클래스 수준에서 한 번만 패치
+        cls._chat_patcher = patch.object(OllamaClient, 'generate_chat')
+        cls.mock_chat = cls._chat_patcher.start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls._get_patcher.stop()
+        cls._post_patcher.stop()
+        cls._head_patcher.stop()
+        cls._chat_patcher.stop()
+        cls.client.close()
+        cls._env_patcher.stop()
     
-    def tearDown(self):
-        # Clean up environment variables
-        for var in ["OLLAMA_API_URL", "OLLAMA_MODEL", "OLLAMA_TEMPERATURE"]:
-            if var in os.environ:
-                del os.environ[var]
+    def setUp(self):
+        # Reset shared-client state so tests stay independent
+        self.client._model_verified_at = 0.0
+        self.client._analysis_cache.clear()
+        self.mock_get.reset_mock(return_value=True, side_effect=True)
+        self.mock_post.reset_mock(return_value=True, side_effect=True)
+        self.mock_head.reset_mock(return_value=True, side_effect=True)
+        self.mock_chat.reset_mock(return_value=True, side_effect=True)
+    
+    @staticmethod
+    def _resp(status=200, text='', json_obj=None, content=b'', lines=None):
+        """가벼운 응답 스텁 (MagicMock의 속성 자동 생성 비용을 피함)"""
+        return SimpleNamespace(
+            status_code=status, text=text, content=content,
+            json=lambda: json_obj,
+            iter_lines=lambda: iter(lines or []),
+            close=lambda: None
+        )
     
     def test_init(self):
         """Test initialization of OllamaClient"""
@@ -31,44 +121,53 @@ class TestOllamaClient(unittest.TestCase):
         self.assertEqual(self.client.model_name, "test-model")
         self.assertEqual(self.client.default_params["temperature"], 0.5)
     
-    @patch('requests.get')
-    def test_check_status_online(self, mock_get):
-        """Test check_status when Ollama is online"""
-        # Mock response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"models": [{"name": "model1"}, {"name": "model2"}]}
-        mock_get.return_value = mock_response
+    def test_check_status_online(self):
+        """Test check_status liveness path when Ollama is online"""
+        # Stub response
+        self.mock_head.return_value = self._resp(200)
         
         # Call the method
         status = self.client.check_status()
         
+        # Assertions
+        self.assertEqual(status["status"], "online")
+        self.assertEqual(self.mock_head.call_count, 1)
+        self.assertEqual(self.mock_head.call_args[0], ("http://test-ollama:11434",))
+        self.assertEqual(self.mock_head.call_args[1], {"timeout": 2})
+    
+    def test_check_status_detailed(self):
+        """Test check_status with detailed=True"""
+        # Stub response
+        self.mock_get.return_value = self._resp(
+            200, json_obj={"models": [{"name": "model1"}, {"name": "model2"}]}
+        )
+        
+        # Call the method
+        status = self.client.check_status(detailed=True)
+        
         # Assertions
         self.assertEqual(status["status"], "online")
         self.assertEqual(status["models"], 2)
-        mock_get.assert_called_once_with("http://test-ollama:11434/api/tags")
+        self.assertEqual(self.mock_get.call_count, 1)
+        self.assertEqual(self.mock_get.call_args[0], ("http://test-ollama:11434/api/tags",))
+        self.assertEqual(self.mock_get.call_args[1], {"timeout": self.client._timeout})
     
-    @patch('requests.get')
-    def test_check_status_error(self, mock_get):
+    def test_check_status_error(self):
         """Test check_status when Ollama returns an error"""
-        # Mock response
-        mock_response = MagicMock()
-        mock_response.status_code = 500
-        mock_response.text = "Internal Server Error"
-        mock_get.return_value = mock_response
+        # Stub response
+        self.mock_get.return_value = self._resp(500, text="Internal Server Error")
         
         # Call the method
-        status = self.client.check_status()
+        status = self.client.check_status(detailed=True)
         
         # Assertions
         self.assertEqual(status["status"], "error")
         self.assertEqual(status["message"], "Internal Server Error")
     
-    @patch('requests.get')
-    def test_check_status_offline(self, mock_get):
+    def test_check_status_offline(self):
         """Test check_status when Ollama is offline"""
-        # Mock exception
-        mock_get.side_effect = Exception("Connection refused")
+        # Raise the concrete network-layer exception type
+        self.mock_head.side_effect = requests.exceptions.ConnectionError("Connection refused")
         
         # Call the method
         status = self.client.check_status()
@@ -77,76 +176,60 @@ class TestOllamaClient(unittest.TestCase):
         self.assertEqual(status["status"], "offline")
         self.assertEqual(status["error"], "Connection refused")
     
-    @patch('requests.get')
-    @patch('requests.post')
-    def test_ensure_model_loaded_already_exists(self, mock_post, mock_get):
+    def test_ensure_model_loaded_already_exists(self):
         """Test ensure_model_loaded when model already exists"""
-        # Mock response for GET
-        mock_get_response = MagicMock()
-        mock_get_response.status_code = 200
-        mock_get_response.json.return_value = {"models": [{"name": "test-model"}, {"name": "other-model"}]}
-        mock_get.return_value = mock_get_response
+        # Stub response for GET
+        self.mock_get.return_value = self._resp(
+            200, json_obj={"models": [{"name": "test-model"}, {"name": "other-model"}]}
+        )
         
         # Call the method
         result = self.client.ensure_model_loaded()
         
         # Assertions
         self.assertTrue(result)
-        mock_get.assert_called_once()
-        mock_post.assert_not_called()
+        self.mock_get.assert_called_once()
+        self.mock_post.assert_not_called()
     
-    @patch('requests.get')
-    @patch('requests.post')
-    def test_ensure_model_loaded_download_success(self, mock_post, mock_get):
+    def test_ensure_model_loaded_download_success(self):
         """Test ensure_model_loaded when model needs to be downloaded"""
-        # Mock response for GET
-        mock_get_response = MagicMock()
-        mock_get_response.status_code = 200
-        mock_get_response.json.return_value = {"models": [{"name": "other-model"}]}
-        mock_get.return_value = mock_get_response
-        
-        # Mock response for POST
-        mock_post_response = MagicMock()
-        mock_post_response.status_code = 200
-        mock_post.return_value = mock_post_response
+        # Stub responses for GET and POST
+        self.mock_get.return_value = self._resp(
+            200, json_obj={"models": [{"name": "other-model"}]}
+        )
+        self.mock_post.return_value = self._resp(200)
         
         # Call the method
         result = self.client.ensure_model_loaded()
         
         # Assertions
         self.assertTrue(result)
-        mock_get.assert_called_once()
-        mock_post.assert_called_once_with(
-            "http://test-ollama:11434/api/pull",
-            json={"name": "test-model"}
+        self.mock_get.assert_called_once()
+        self.assertEqual(self.mock_post.call_count, 1)
+        self.assertEqual(self.mock_post.call_args[0], ("http://test-ollama:11434/api/pull",))
+        self.assertEqual(
+            self.mock_post.call_args[1],
+            {"json": {"name": "test-model"}, "timeout": self.client._timeout}
         )
     
-    @patch('requests.post')
-    def test_generate_text_success(self, mock_post):
-        """Test generate_text with successful response"""
-        # Mock response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.text = '{"response":"partial"}\n{"response":" text","eval_count":100,"eval_duration":1.5}'
-        mock_post.return_value = mock_response
-        
+    def test_generate_text_success(self):
+        """Test generate_text with successful streaming response"""
+        # Stub NDJSON stream response
+        self.mock_post.return_value = self._resp(200, lines=_NDJSON_OK_LINES)
+
         # Call the method
         result = self.client.generate_text("Test prompt")
-        
+
         # Assertions
-        self.assertEqual(result["result"], " text")
+        self.assertEqual(result["result"], "partial text")
         self.assertEqual(result["eval_count"], 100)
         self.assertEqual(result["eval_duration"], 1.5)
-        mock_post.assert_called_once()
+        self.mock_post.assert_called_once()
     
-    @patch('requests.post')
-    def test_generate_text_error(self, mock_post):
+    def test_generate_text_error(self):
         """Test generate_text with error response"""
-        # Mock response
-        mock_response = MagicMock()
-        mock_response.status_code = 500
-        mock_response.text = "Internal Server Error"
-        mock_post.return_value = mock_response
+        # Stub response
+        self.mock_post.return_value = self._resp(500, text="Internal Server Error")
         
         # Call the method
         result = self.client.generate_text("Test prompt")
@@ -155,13 +238,10 @@ class TestOllamaClient(unittest.TestCase):
         self.assertEqual(result["result"], "")
         self.assertEqual(result["error"], "Internal Server Error")
     
-    @patch.object(OllamaClient, 'generate_text')
-    def test_analyze_sentiment(self, mock_generate_text):
+    def test_analyze_sentiment(self):
         """Test analyze_sentiment with valid JSON response"""
-        # Mock generate_text response
-        mock_generate_text.return_value = {
-            "result": 'Analysis: {"sentiment": "positive", "confidence": 0.85, "explanation": "The text contains positive words."}'
-        }
+        # Mock generate_chat response
+        self.mock_chat.return_value = _SENTIMENT_CHAT_RESULT
         
         # Call the method
         result = self.client.analyze_sentiment("This is a great day!")
@@ -171,13 +251,10 @@ class TestOllamaClient(unittest.TestCase):
         self.assertEqual(result["confidence"], 0.85)
         self.assertEqual(result["details"]["explanation"], "The text contains positive words.")
     
-    @patch.object(OllamaClient, 'generate_text')
-    def test_detect_anomaly(self, mock_generate_text):
+    def test_detect_anomaly(self):
         """Test detect_anomaly with valid JSON response"""
-        # Mock generate_text response
-        mock_generate_text.return_value = {
-            "result": 'Analysis: {"anomaly_status": "warning", "confidence": 0.75, "detected_issues": ["High CPU usage"], "explanation": "The log shows high CPU usage."}'
-        }
+        # Mock generate_chat response
+        self.mock_chat.return_value = _ANOMALY_CHAT_RESULT
         
         # Call the method
         result = self.client.detect_anomaly("CPU usage at 95%")
@@ -188,15 +265,10 @@ class TestOllamaClient(unittest.TestCase):
         self.assertEqual(result["details"]["detected_issues"], ["High CPU usage"])
         self.assertEqual(result["details"]["explanation"], "The log shows high CPU usage.")
     
-    @patch.object(OllamaClient, 'generate_text')
-    def test_generate_summary(self, mock_generate_text):
+    def test_generate_summary(self):
         """Test generate_summary"""
-        # Mock generate_text response
-        mock_generate_text.return_value = {
-            "result": "This is a summary of the text.",
-            "eval_count": 50,
-            "eval_duration": 0.8
-        }
+        # Mock generate_chat response
+        self.mock_chat.return_value = _SUMMARY_CHAT_RESULT
         
         # Call the method
         result = self.client.generate_summary("This is a long text that needs to be summarized.")
@@ -206,69 +278,68 @@ class TestOllamaClient(unittest.TestCase):
         self.assertEqual(result["details"]["eval_count"], 50)
         self.assertEqual(result["details"]["eval_duration"], 0.8)
     
+    def _assert_contains_all(self, text, tokens):
+        """토큰 목록이 순서대로 포함되는지 한 번의 전진 탐색으로 확인합니다."""
+        offset = 0
+        for token in tokens:
+            index = text.find(token, offset)
+            if index < 0:
+                self.fail(f"'{token}' not found in prompt (after offset {offset})")
+            offset = index + len(token)
+    
     def test_create_fine_tuning_prompt_sentiment(self):
         """Test create_fine_tuning_prompt for sentiment analysis"""
-        examples = [
-            {
-                "text": "I love this product!",
-                "sentiment": "positive",
-                "explanation": "Contains positive words like 'love'"
-            },
-            {
-                "text": "This is terrible.",
-                "sentiment": "negative",
-                "explanation": "Contains negative words like 'terrible'"
-            }
-        ]
+        prompt = self.client.create_fine_tuning_prompt(_SENTIMENT_EXAMPLES, "sentiment")
         
-        prompt = self.client.create_fine_tuning_prompt(examples, "sentiment")
-        
-        # Basic assertions
-        self.assertIn("감정 분석 학습", prompt)
-        self.assertIn("I love this product!", prompt)
-        self.assertIn("This is terrible.", prompt)
-        self.assertIn("positive", prompt)
-        self.assertIn("negative", prompt)
+        # Basic assertions (order follows the example sequence)
+        self._assert_contains_all(prompt, [
+            "감정 분석 학습",
+            "I love this product!",
+            "positive",
+            "This is terrible.",
+            "negative"
+        ])
     
     def test_create_fine_tuning_prompt_anomaly(self):
         """Test create_fine_tuning_prompt for anomaly detection"""
-        examples = [
-            {
-                "log_text": "CPU usage at 95%",
-                "anomaly_status": "warning",
-                "detected_issues": ["High CPU usage"],
-                "explanation": "CPU usage is very high"
-            }
-        ]
-        
-        prompt = self.client.create_fine_tuning_prompt(examples, "anomaly")
+        prompt = self.client.create_fine_tuning_prompt(_ANOMALY_EXAMPLES, "anomaly")
         
-        # Basic assertions
-        self.assertIn("이상 탐지 학습", prompt)
-        self.assertIn("CPU usage at 95%", prompt)
-        self.assertIn("warning", prompt)
-        self.assertIn("High CPU usage", prompt)
+        # Basic assertions (order follows the example sequence)
+        self._assert_contains_all(prompt, [
+            "이상 탐지 학습",
+            "CPU usage at 95%",
+            "warning",
+            "High CPU usage"
+        ])
     
     def test_create_fine_tuning_prompt_summary(self):
         """Test create_fine_tuning_prompt for text summarization"""
-        examples = [
-            {
-                "original_text": "This is a long text that needs to be summarized.",
-                "summary": "This is a summary."
-            }
-        ]
+        prompt = self.client.create_fine_tuning_prompt(_SUMMARY_EXAMPLES, "summary")
         
-        prompt = self.client.create_fine_tuning_prompt(examples, "summary")
-        
-        # Basic assertions
-        self.assertIn("텍스트 요약 학습", prompt)
-        self.assertIn("This is a long text that needs to be summarized.", prompt)
-        self.assertIn("This is a summary.", prompt)
+        # Basic assertions (order follows the example sequence)
+        self._assert_contains_all(prompt, [
+            "텍스트 요약 학습",
+            "This is a long text that needs to be summarized.",
+            "This is a summary."
+        ])
     
     def test_create_fine_tuning_prompt_unsupported(self):
         """Test create_fine_tuning_prompt with unsupported task type"""
         prompt = self.client.create_fine_tuning_prompt([], "unsupported_task")
         self.assertEqual(prompt, "")
 
+class _TimingResult(unittest.TextTestResult):
+    """테스트별 소요 시간을 출력해 느린 픽스처를 찾기 위한 결과 클래스"""
+    
+    def startTest(self, test):
+        self._started_at = time.perf_counter()
+        super().startTest(test)
+    
+    def stopTest(self, test):
+        super().stopTest(test)
+        elapsed = time.perf_counter() - self._started_at
+        self.stream.writeln(f"{test.id()}: {elapsed:.4f}s")
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    # pytest로 실행할 때는 --durations=10 으로 같은 정보를 얻을 수 있습니다
+    unittest.main(testRunner=unittest.TextTestRunner(resultclass=_TimingResult))
\ No newline at end of file